@@ -1,12 +1,21 @@
+import startup  # first, so the startup clock covers every other import
 import os
 from datetime import timedelta
 from flask import Flask, jsonify
 from flask_migrate import Migrate
 from flask_login import LoginManager
-from models import db, User
+from models import db
 from routes import register_blueprints
+from cli import register_commands
+from cache import get_user
+import assets
+import database
+import jobs
+import jsonprovider
+import sqlstats
 
 app = Flask(__name__)
+jsonprovider.init_app(app)
 
 # Railway uses postgres:// but SQLAlchemy needs postgresql://
 _db_url = os.environ.get(
@@ -17,11 +26,17 @@ if _db_url.startswith("postgres://"):
     _db_url = _db_url.replace("postgres://", "postgresql://", 1)
 
 app.config["SQLALCHEMY_DATABASE_URI"] = _db_url
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(_db_url)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-change-me")
 app.config["REMEMBER_COOKIE_DURATION"] = timedelta(days=30)
+app.config["JOBS_EAGER"] = os.environ.get("JOBS_EAGER") == "1"
+app.config["JOBS_WORKERS"] = int(os.environ.get("JOBS_WORKERS", 2))
 
 db.init_app(app)
+database.init_app(app, db)
+sqlstats.init_app(app, db)
+jobs.init_app(app)
 migrate = Migrate(app, db)
 
 # Flask-Login setup
@@ -31,7 +46,7 @@ login_manager.init_app(app)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    return get_user(int(user_id))
 
 
 @login_manager.unauthorized_handler
@@ -39,8 +54,11 @@ def unauthorized():
     return jsonify({"error": "Login required"}), 401
 
 
-# Register route blueprints
+# Register route blueprints and CLI commands
 register_blueprints(app)
+register_commands(app)
+assets.init_app(app)
+startup.init_app(app)
 
 
 # ---------------------------------------------------------------------------
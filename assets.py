@@ -0,0 +1,136 @@
+"""Fingerprinted, pre-compressed static assets.
+
+``flask assets build`` (run at image build, see Dockerfile) copies static/
+into static/dist/ under content-hashed names and writes .gz (and, when the
+optional ``brotli`` package is installed, .br) variants next to each file,
+plus a manifest mapping source paths to built ones. routes/assets.py serves
+them with year-long immutable caching.
+
+CSS is bundled: local ``@import``s are inlined into style.css, so the page
+makes one stylesheet request instead of a chain of them. The ES modules
+import each other by relative path (some cyclically), so their sources are
+left untouched; an import map in index.html points each module's plain URL
+at its hashed file instead.
+
+Without a build (local development) asset_url() falls back to /static/.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only builds
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+URL_PREFIX = "/assets/"
+
+# Built sources, relative to static/. CSS partials are inlined into style.css.
+ENTRY_CSS = ["css/style.css"]
+MODULE_DIRS = ["js"]
+COMPRESSIBLE = (".css", ".js", ".json", ".svg")
+# Compressing tiny files costs more in headers and CPU than it saves
+MIN_COMPRESS_SIZE = 512
+
+LOCAL_IMPORT_RE = re.compile(r"""@import\s+(?:url\()?["']([^"':)]+\.css)["']\)?\s*;""")
+REMOTE_IMPORT_RE = re.compile(r"""@import\s+url\(["']?https?://[^)]*\)[^;]*;""")
+
+
+def _hashed_name(path, data):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def _bundle_css(path, seen=None):
+    """Return (css, remote_imports) with local @imports of ``path`` inlined."""
+    seen = set() if seen is None else seen
+    seen.add(path)
+    with open(os.path.join(STATIC_DIR, path), encoding="utf-8") as f:
+        css = f.read()
+    remote = REMOTE_IMPORT_RE.findall(css)
+    css = REMOTE_IMPORT_RE.sub("", css)
+
+    def inline(match):
+        child = os.path.normpath(os.path.join(os.path.dirname(path), match.group(1)))
+        if child in seen:
+            return ""
+        child_css, child_remote = _bundle_css(child, seen)
+        remote.extend(child_remote)
+        return child_css
+
+    return LOCAL_IMPORT_RE.sub(inline, css), remote
+
+
+def _write(rel_path, data):
+    out = os.path.join(DIST_DIR, rel_path)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "wb") as f:
+        f.write(data)
+    if rel_path.endswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_SIZE:
+        with open(out + ".gz", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(out + ".br", "wb") as f:
+                f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Rebuild static/dist/ from static/; return the manifest."""
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    manifest = {}
+    for path in ENTRY_CSS:
+        css, remote = _bundle_css(path)
+        # @import must precede every other rule, so hoist the remote ones
+        data = "\n".join([*dict.fromkeys(remote), css]).encode()
+        manifest[path] = _hashed_name(path, data)
+        _write(manifest[path], data)
+    for module_dir in MODULE_DIRS:
+        for name in sorted(os.listdir(os.path.join(STATIC_DIR, module_dir))):
+            path = f"{module_dir}/{name}"
+            with open(os.path.join(STATIC_DIR, path), "rb") as f:
+                data = f.read()
+            manifest[path] = _hashed_name(path, data)
+            _write(manifest[path], data)
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Template helpers
+# ---------------------------------------------------------------------------
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def init_app(app):
+    """Expose asset_url() and import_map() to templates."""
+    manifest = load_manifest()
+
+    def asset_url(path):
+        built = manifest.get(path)
+        return URL_PREFIX + built if built else f"/static/{path}"
+
+    def import_map():
+        return {
+            "imports": {
+                URL_PREFIX + path: URL_PREFIX + built
+                for path, built in manifest.items()
+                if path.endswith(".js")
+            }
+        }
+
+    app.jinja_env.globals.update(
+        asset_url=asset_url, import_map=import_map, assets_built=bool(manifest)
+    )
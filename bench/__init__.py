@@ -0,0 +1 @@
+"""Benchmarks and load tests. Run from the repo root: `python -m bench.<name>`."""
@@ -0,0 +1,48 @@
+"""Compare two bench.load result files route by route.
+
+    python -m bench.compare before.json after.json
+
+Prints p50/p95/p99 latency and throughput for each route with the change
+from the first run to the second; negative latency deltas are improvements.
+"""
+import argparse
+import json
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "rps"]
+
+
+def _delta(before, after):
+    if not before:
+        return "    n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    header = "".join(f" {m:>24}" for m in METRICS)
+    print(f"{'route':<44}{header}")
+    rows = [(label, before["endpoints"].get(label), after["endpoints"].get(label))
+            for label in sorted(set(before["endpoints"]) | set(after["endpoints"]))]
+    rows.append(("TOTAL", before["total"], after["total"]))
+    for label, b, a in rows:
+        if b is None or a is None:
+            print(f"{label:<44} only in {'after' if b is None else 'before'}")
+            continue
+        cells = "".join(
+            f" {b[m]:>8.1f} → {a[m]:>7.1f} {_delta(b[m], a[m])}" for m in METRICS
+        )
+        print(f"{label:<44}{cells}")
+
+
+if __name__ == "__main__":
+    main()
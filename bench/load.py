@@ -0,0 +1,390 @@
+"""HTTP load driver: every API route, with a read/write mix, against a live server.
+
+Run the app (``make run``, ``make docker-up`` or gunicorn) against a database
+seeded by bench.seed, then:
+
+    python -m bench.load --base-url http://localhost:5001 --concurrency 8 \\
+        --duration 60 --write-ratio 0.1 --out before.json
+
+Each worker thread logs in as one of the seeded users and loops over
+weighted operations (page loads, list/filter/stream/ascents reads, and
+project/session/location/profile writes that clean up after themselves)
+until the duration is up. Reports requests/s and p50/p95/p99 latency per
+route; compare two result files with bench.compare.
+"""
+import argparse
+import gzip
+import http.cookiejar
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from urllib.parse import quote
+
+from bench.seed import PASSWORD, username
+
+
+class Client:
+    """One browser-like session: its own cookie jar, gzip-capable."""
+
+    def __init__(self, base_url, stats):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, label, method, path, body=None):
+        """Time one request under ``label``; return its decoded body, or None on error."""
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header("Accept-Encoding", "gzip")
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                payload = resp.read()
+                status = resp.status
+                is_json = resp.headers.get_content_type() == "application/json"
+                if resp.headers.get("Content-Encoding") == "gzip":
+                    payload = gzip.decompress(payload)
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except OSError:
+            status = 0
+        self.stats.record(label, time.perf_counter() - start, status)
+        if status == 0 or status >= 400:
+            return None
+        return json.loads(payload) if is_json and payload else payload
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label, seconds, status):
+        with self.lock:
+            self.latencies[label].append(seconds)
+            if status == 0 or status >= 400:
+                self.errors[label] += 1
+
+    def summary(self, elapsed):
+        def describe(samples, errors):
+            samples = sorted(samples)
+
+            def pct(p):
+                return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+            return {
+                "count": len(samples),
+                "errors": errors,
+                "rps": round(len(samples) / elapsed, 2),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+                "p50_ms": pct(50),
+                "p95_ms": pct(95),
+                "p99_ms": pct(99),
+                "max_ms": round(samples[-1] * 1000, 2),
+            }
+
+        endpoints = {
+            label: describe(samples, self.errors[label])
+            for label, samples in sorted(self.latencies.items())
+        }
+        everything = [s for samples in self.latencies.values() for s in samples]
+        return endpoints, describe(everything, sum(self.errors.values()))
+
+
+class Worker:
+    """One simulated user working through weighted operations."""
+
+    def __init__(self, client, user, rng):
+        self.c = client
+        self.u = user
+        self.rng = rng
+        self.project_ids = []
+        self.created_projects = []
+        self.created_sessions = []
+        self.created_locations = []
+        self.location_ids = []
+
+    # -- setup / teardown ---------------------------------------------------
+
+    def signup_throwaway(self, name):
+        self.c.request("POST /api/auth/signup", "POST", "/api/auth/signup",
+                       {"username": name, "password": PASSWORD})
+        self.c.request("POST /api/auth/logout", "POST", "/api/auth/logout")
+
+    def login(self):
+        self.c.request("POST /api/auth/login", "POST", "/api/auth/login",
+                       {"username": self.u, "password": PASSWORD})
+        projects = self.c.request("GET /api/<u>/projects", "GET", f"/api/{self.u}/projects") or []
+        self.project_ids = [p["id"] for p in projects]
+        locations = self.c.request(
+            "GET /api/locations/search", "GET", "/api/locations/search?q=bench+area&limit=50"
+        ) or []
+        self.location_ids = [loc["id"] for loc in locations]
+
+    def teardown(self):
+        for project_id in self.created_projects:
+            self.c.request("DELETE /api/<u>/projects/<id>", "DELETE", f"/api/{self.u}/projects/{project_id}")
+        for loc_id in self.created_locations:
+            self.c.request("DELETE /api/locations/<id>", "DELETE", f"/api/locations/{loc_id}")
+        self.c.request("POST /api/auth/logout", "POST", "/api/auth/logout")
+
+    # -- reads --------------------------------------------------------------
+
+    def page(self):
+        tab = self.rng.choice(["projects", "ascents", "stream", "locations"])
+        self.c.request("GET /<u>/<tab>", "GET", f"/{self.u}/{tab}")
+
+    def bootstrap(self):
+        self.c.request("GET /api/<u>/bootstrap", "GET", f"/api/{self.u}/bootstrap")
+
+    def projects(self):
+        self.c.request("GET /api/<u>/projects", "GET", f"/api/{self.u}/projects")
+
+    def projects_filtered(self):
+        qs = self.rng.choice(["status=1,0", "type=1", "date=ytd", "status=3&type=0", "date=2023"])
+        self.c.request("GET /api/<u>/projects?filters", "GET", f"/api/{self.u}/projects?{qs}")
+
+    def project_states(self):
+        self.c.request("GET /api/<u>/project-states", "GET", f"/api/{self.u}/project-states")
+
+    def session_years(self):
+        self.c.request("GET /api/<u>/session-years", "GET", f"/api/{self.u}/session-years")
+
+    def year_totals(self):
+        self.c.request("GET /api/<u>/year-totals", "GET", f"/api/{self.u}/year-totals")
+
+    def ascents(self):
+        self.c.request("GET /api/<u>/ascents", "GET", f"/api/{self.u}/ascents")
+
+    def pyramid(self):
+        self.c.request("GET /api/<u>/ascents/pyramid", "GET", f"/api/{self.u}/ascents/pyramid?buckets=mp")
+
+    def stream(self):
+        page = self.c.request("GET /api/<u>/stream?limit", "GET", f"/api/{self.u}/stream?limit=100")
+        if page and page.get("next") and self.rng.random() < 0.5:
+            self.c.request("GET /api/<u>/stream?cursor", "GET",
+                           f"/api/{self.u}/stream?limit=100&cursor={page['next']}")
+
+    def project_sessions(self):
+        if self.project_ids:
+            project_id = self.rng.choice(self.project_ids)
+            self.c.request("GET /api/<u>/projects/<id>/sessions", "GET",
+                           f"/api/{self.u}/projects/{project_id}/sessions")
+
+    def export(self):
+        fmt = self.rng.choice(["jsonl", "csv"])
+        self.c.request("GET /api/<u>/export", "GET", f"/api/{self.u}/export?format={fmt}")
+
+    def enums(self):
+        self.c.request("GET /api/enums", "GET", "/api/enums")
+
+    def countries(self):
+        self.c.request("GET /api/countries", "GET", "/api/countries")
+
+    def subdivisions(self):
+        cc = self.rng.choice(["US", "CA", "FR", "ES", "CN", "ZA"])
+        self.c.request("GET /api/countries/<cc>/subdivisions", "GET", f"/api/countries/{cc}/subdivisions")
+
+    def locations(self):
+        self.c.request("GET /api/<u>/locations", "GET", f"/api/{self.u}/locations")
+
+    def location_search(self):
+        q = self.rng.choice(["bench", "area 1", "crag", "cal", "western"])
+        self.c.request("GET /api/locations/search", "GET", f"/api/locations/search?q={quote(q)}")
+
+    def me(self):
+        self.c.request("GET /api/auth/me", "GET", "/api/auth/me")
+
+    def health(self):
+        self.c.request("GET /health", "GET", "/health")
+
+    def health_pool(self):
+        self.c.request("GET /health/pool", "GET", "/health/pool")
+
+    # -- writes -------------------------------------------------------------
+
+    def create_project(self):
+        boulder = self.rng.random() < 0.6
+        body = {
+            "name": f"Load {self.rng.randint(1, 10**6)}",
+            "grade": f"V{self.rng.randint(0, 10)}" if boulder else f"5.1{self.rng.randint(1, 3)}a",
+            "type": 1 if boulder else 0,
+            "location_id": self.rng.choice(self.location_ids) if self.location_ids else None,
+        }
+        project = self.c.request("POST /api/<u>/projects", "POST", f"/api/{self.u}/projects", body)
+        if project:
+            self.created_projects.append(project["id"])
+            self.project_ids.append(project["id"])
+
+    def update_project(self):
+        if self.created_projects:
+            project_id = self.rng.choice(self.created_projects)
+            self.c.request("PUT /api/<u>/projects/<id>", "PUT", f"/api/{self.u}/projects/{project_id}",
+                           {"notes": f"edited {time.time()}"})
+
+    def delete_project(self):
+        if self.created_projects:
+            project_id = self.created_projects.pop(self.rng.randrange(len(self.created_projects)))
+            self.project_ids.remove(project_id)
+            self.created_sessions = [(p, s) for p, s in self.created_sessions if p != project_id]
+            self.c.request("DELETE /api/<u>/projects/<id>", "DELETE", f"/api/{self.u}/projects/{project_id}")
+
+    def create_session(self):
+        if self.project_ids:
+            project_id = self.rng.choice(self.project_ids)
+            body = {"date": time.strftime("%Y-%m-%d"), "style": self.rng.choice([0, 0, 0, 1, 2])}
+            session = self.c.request("POST /api/<u>/projects/<id>/sessions", "POST",
+                                     f"/api/{self.u}/projects/{project_id}/sessions", body)
+            if session:
+                self.created_sessions.append((project_id, session["id"]))
+
+    def update_session(self):
+        if self.created_sessions:
+            _, session_id = self.rng.choice(self.created_sessions)
+            self.c.request("PUT /api/<u>/sessions/<id>", "PUT", f"/api/{self.u}/sessions/{session_id}",
+                           {"style": self.rng.choice([0, 1, 2])})
+
+    def delete_session(self):
+        if self.created_sessions:
+            _, session_id = self.created_sessions.pop(self.rng.randrange(len(self.created_sessions)))
+            self.c.request("DELETE /api/<u>/sessions/<id>", "DELETE", f"/api/{self.u}/sessions/{session_id}")
+
+    def update_profile(self):
+        self.c.request("PUT /api/auth/profile", "PUT", "/api/auth/profile",
+                       {"height_cm": self.rng.randint(150, 200)})
+
+    def create_location(self):
+        body = {"country_code": "US", "state_code": "US-CA", "area": f"Load Area {self.rng.randint(1, 10**6)}"}
+        loc = self.c.request("POST /api/locations", "POST", "/api/locations", body)
+        if loc:
+            self.created_locations.append(loc["id"])
+
+    def update_location(self):
+        if self.created_locations:
+            loc_id = self.rng.choice(self.created_locations)
+            self.c.request("PUT /api/locations/<id>", "PUT", f"/api/locations/{loc_id}",
+                           {"crag": f"Crag {self.rng.randint(1, 99)}"})
+
+    def delete_location(self):
+        if self.created_locations:
+            loc_id = self.created_locations.pop()
+            self.c.request("DELETE /api/locations/<id>", "DELETE", f"/api/locations/{loc_id}")
+
+    def import_logbook(self):
+        name = f"Imported {self.rng.randint(1, 10**6)}"
+        body = {"projects": [{"name": name, "grade": "V4", "type": "boulder",
+                              "sessions": [{"date": "2024-03-01"}, {"date": "2024-03-08", "style": "send"}]}]}
+        result = self.c.request("POST /api/<u>/import", "POST", f"/api/{self.u}/import", body)
+        if result and result.get("projects_created"):
+            projects = self.c.request("GET /api/<u>/projects", "GET", f"/api/{self.u}/projects") or []
+            for p in projects:
+                if p["name"] == name:
+                    self.created_projects.append(p["id"])
+                    self.project_ids.append(p["id"])
+
+
+READS = [
+    ("page", 5), ("bootstrap", 3), ("projects", 10), ("projects_filtered", 5),
+    ("project_states", 3), ("session_years", 3), ("year_totals", 2), ("ascents", 3),
+    ("pyramid", 4), ("stream", 5), ("project_sessions", 3), ("export", 0.2),
+    ("enums", 1), ("countries", 1), ("subdivisions", 1), ("locations", 2),
+    ("location_search", 2), ("me", 2), ("health", 1), ("health_pool", 0.5),
+]
+WRITES = [
+    ("create_project", 2), ("update_project", 2), ("delete_project", 1),
+    ("create_session", 4), ("update_session", 2), ("delete_session", 1),
+    ("update_profile", 0.5), ("create_location", 0.3), ("update_location", 0.3),
+    ("delete_location", 0.2), ("import_logbook", 0.2),
+]
+
+
+def operation_table(write_ratio):
+    """Operation names and weights, with writes scaled to ``write_ratio`` of calls."""
+    read_total = sum(w for _, w in READS)
+    write_total = sum(w for _, w in WRITES)
+    ops = [(name, (1 - write_ratio) * w / read_total) for name, w in READS]
+    ops += [(name, write_ratio * w / write_total) for name, w in WRITES]
+    return [name for name, _ in ops], [w for _, w in ops]
+
+
+def run_worker(index, args, stats, deadline, names, weights):
+    rng = random.Random(args.seed * 1000 + index)
+    client = Client(args.base_url, stats)
+    worker = Worker(client, username(index % args.users + 1), rng)
+    worker.signup_throwaway(f"benchload{int(time.time()) % 10**8}{index:03d}")
+    worker.login()
+    while time.perf_counter() < deadline:
+        getattr(worker, rng.choices(names, weights)[0])()
+    worker.teardown()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:5001")
+    parser.add_argument("--users", type=int, default=20, help="seeded users to spread workers over")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    stats = Stats()
+    names, weights = operation_table(args.write_ratio)
+    started = time.time()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=run_worker, args=(i, args, stats, deadline, names, weights))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    endpoints, total = stats.summary(elapsed)
+    print(f"{'route':<44} {'n':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, s in endpoints.items():
+        print(f"{label:<44} {s['count']:>6} {s['errors']:>4} {s['rps']:>8.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+    print(f"{'TOTAL':<44} {total['count']:>6} {total['errors']:>4} {total['rps']:>8.1f} "
+          f"{total['p50_ms']:>8.1f} {total['p95_ms']:>8.1f} {total['p99_ms']:>8.1f}")
+    if args.out:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+                "elapsed_s": round(elapsed, 2),
+                **{k: v for k, v in vars(args).items() if k != "out"},
+            },
+            "total": total,
+            "endpoints": endpoints,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
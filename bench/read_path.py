@@ -0,0 +1,111 @@
+"""Rows/sec and memory of the /stream read path: ORM entities vs column rows.
+
+    python -m bench.read_path --rows 10000 100000
+
+Runs against DATABASE_URL. "orm" is the query as it was before the column
+select (Session and Project entities, with project.location lazy-loaded per
+row); "core" is routes.ascents: one joined select of the needed columns,
+returning plain rows. Both are serialized to dicts, as the endpoint does.
+
+The user defaults to the bench user with the most sessions; seed enough for
+the largest --rows first, e.g. ``make bench-seed args="--users 1 --projects
+2000 --sessions 50"`` for about 100k.
+"""
+import argparse
+import logging
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+
+def _orm_rows(db, user, limit):
+    from models import Project, Session
+    from bench.serialize import _legacy_session_to_dict
+
+    q = (
+        db.session.query(Session, Project)
+        .join(Project, Session.project_id == Project.id)
+        .filter(Project.user_id == user.id, Session.planned == False)  # noqa: E712
+        .order_by(Session.date.desc(), Session.id.desc())
+        .limit(limit)
+    )
+    return [_legacy_session_to_dict(s, p) for s, p in q.all()]
+
+
+def _core_rows(db, user, limit):
+    from routes.ascents import _build_session_query, _execute, _session_to_dict
+
+    return [_session_to_dict(row) for row in _execute(_build_session_query(user).limit(limit))]
+
+
+def _measure(db, fn, user, limit, runs):
+    """(best seconds, rows, statements, peak MiB) for one read path."""
+    statements = []
+    count = lambda *args: statements.append(1)  # noqa: E731
+    best = None
+    for _ in range(runs):
+        db.session.expunge_all()  # start each run with an empty identity map
+        statements.clear()
+        event.listen(db.engine, "before_cursor_execute", count)
+        start = time.perf_counter()
+        rows = fn(db, user, limit)
+        elapsed = time.perf_counter() - start
+        event.remove(db.engine, "before_cursor_execute", count)
+        best = elapsed if best is None else min(best, elapsed)
+    queries = len(statements)
+
+    # Separate run for memory: tracemalloc slows everything down
+    db.session.expunge_all()
+    tracemalloc.start()
+    rows = fn(db, user, limit)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, len(rows), queries, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--user", help="username (default: bench user with most sessions)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from app import app
+    from models import db, Project, Session, User
+    from bench.seed import USER_PREFIX
+
+    # Full-history reads are slow queries by design here; don't log each one
+    logging.getLogger("kexian.sql").setLevel(logging.ERROR)
+
+    with app.test_request_context("/"):
+        if args.user:
+            user = db.session.scalar(db.select(User).where(User.username == args.user))
+        else:
+            user = db.session.scalar(
+                db.select(User)
+                .join(Project, Project.user_id == User.id)
+                .join(Session, Session.project_id == Project.id)
+                .where(User.username.like(f"{USER_PREFIX}%"))
+                .group_by(User.id)
+                .order_by(db.func.count(Session.id).desc())
+                .limit(1)
+            )
+        if user is None:
+            raise SystemExit("No such user; run `make bench-seed` or pass --user.")
+
+        print(f"user {user.username}, best of {args.runs} runs")
+        print(f"{'rows':>8} {'path':<5} {'seconds':>8} {'rows/s':>10} {'queries':>8} {'peak MiB':>9}")
+        for limit in args.rows:
+            for name, fn in [("orm", _orm_rows), ("core", _core_rows)]:
+                seconds, rows, queries, peak = _measure(db, fn, user, limit, args.runs)
+                print(
+                    f"{rows:>8} {name:<5} {seconds:8.3f} {rows / seconds:10.0f} "
+                    f"{queries:>8} {peak:9.1f}"
+                )
+            if rows < limit:
+                print(f"  (only {rows} sessions for {user.username}; seed more for {limit})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Synthetic data for benchmarks: users x projects x sessions x locations.
+
+Writes straight to DATABASE_URL (meant for a local Postgres, e.g. `make db`)
+with bulk inserts, then fills in project summaries and rollups the same way
+the import does. The same ``--seed`` always produces the same data:
+
+    python -m bench.seed --users 20 --projects 200 --sessions 25 --locations 300
+
+Users are named bench0001, bench0002, ... with password ``bench-password``
+(what bench.load logs in with). Locations are areas named "Bench Area N".
+``--reset`` first deletes everything a previous seed created; other data is
+never touched.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+USER_PREFIX = "bench"
+PASSWORD = "bench-password"
+AREA_PREFIX = "Bench Area "
+BATCH_SIZE = 5000
+
+# (country, subdivision) pairs the generated locations are spread over
+REGIONS = [
+    ("US", "US-CA"), ("US", "US-CO"), ("US", "US-UT"), ("US", "US-NV"),
+    ("US", "US-WY"), ("US", "US-NY"), ("CA", "CA-BC"), ("FR", ""),
+    ("ES", "ES-CT"), ("ZA", "ZA-WC"), ("CN", "CN-GX"), ("GR", ""),
+]
+
+
+def username(i):
+    return f"{USER_PREFIX}{i:04d}"
+
+
+def reset(db, models):
+    """Delete users, projects, sessions, rollups and locations from earlier seeds."""
+    User, Project, Session, SessionRollup, Location = models
+    bench_users = db.select(User.id).where(User.username.like(f"{USER_PREFIX}%"))
+    bench_projects = db.select(Project.id).where(Project.user_id.in_(bench_users))
+    db.session.execute(db.delete(Session).where(Session.project_id.in_(bench_projects)))
+    db.session.execute(db.delete(SessionRollup).where(SessionRollup.user_id.in_(bench_users)))
+    db.session.execute(db.delete(Project).where(Project.user_id.in_(bench_users)))
+    db.session.execute(db.delete(User).where(User.id.in_(bench_users)))
+    db.session.execute(
+        db.delete(Location)
+        .where(Location.area.like(f"{AREA_PREFIX}%"))
+        .where(~Location.id.in_(db.select(Project.location_id).where(Project.location_id.isnot(None))))
+    )
+
+
+def _insert(db, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(db.insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(args):
+    import catalog
+    from app import app
+    from models import db, Country, Location, Project, Session, SessionRollup, Subdivision, User
+    from routes.projects import VALID_BOULDER_GRADES, VALID_ROPE_GRADES
+
+    rng = random.Random(args.seed)
+    boulder_grades = sorted(VALID_BOULDER_GRADES)
+    rope_grades = sorted(VALID_ROPE_GRADES)
+    today = date.today()
+    timings = {}
+
+    with app.app_context():
+        if args.reset:
+            reset(db, (User, Project, Session, SessionRollup, Location))
+            db.session.commit()
+
+        if db.session.scalar(db.select(User.id).where(User.username == username(1))):
+            raise SystemExit("Bench data already exists; rerun with --reset.")
+
+        t = time.perf_counter()
+        # One hash for everyone: hashing per user would dominate small seeds
+        template = User(username="x")
+        template.set_password(PASSWORD)
+        password_hash = template.password_hash
+        _insert(db, User, [
+            {"username": username(i), "password_hash": password_hash}
+            for i in range(1, args.users + 1)
+        ])
+        user_ids = db.session.scalars(
+            db.select(User.id).where(User.username.like(f"{USER_PREFIX}%")).order_by(User.id)
+        ).all()
+
+        country_ids = Country.ids_for({country_code for country_code, _ in REGIONS})
+        subdivision_ids = Subdivision.ids_for({state_code for _, state_code in REGIONS if state_code})
+        location_rows = []
+        for i in range(1, args.locations + 1):
+            country_code, state_code = REGIONS[i % len(REGIONS)]
+            location_rows.append({
+                "country_id": country_ids[country_code],
+                "subdivision_id": subdivision_ids.get(state_code),
+                "area": f"{AREA_PREFIX}{i}",
+                "crag": f"Crag {rng.randint(1, 20)}" if rng.random() < 0.7 else "",
+            })
+        _insert(db, Location, location_rows)
+        location_ids = db.session.scalars(
+            db.select(Location.id).where(Location.area.like(f"{AREA_PREFIX}%"))
+        ).all()
+        timings["users_locations_s"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        project_rows = []
+        for user_id in user_ids:
+            for n in range(args.projects):
+                climb_type = rng.choices([0, 1, 2], weights=[3, 6, 1])[0]
+                project_rows.append({
+                    "user_id": user_id,
+                    "name": f"Problem {user_id}-{n}",
+                    "grade": rng.choice(boulder_grades if climb_type == 1 else rope_grades),
+                    "type": climb_type,
+                    "pitches": None if climb_type == 1 else rng.randint(1, 3),
+                    "length": None if climb_type == 1 else f"{rng.randint(15, 40)}m",
+                    "location_id": rng.choice(location_ids) if rng.random() < 0.9 else None,
+                    "notes": "",
+                })
+        _insert(db, Project, project_rows)
+        project_ids = db.session.scalars(
+            db.select(Project.id).where(Project.user_id.in_(user_ids))
+        ).all()
+        timings["projects_s"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        session_rows = []
+        for project_id in project_ids:
+            for _ in range(rng.randint(0, 2 * args.sessions)):
+                day = today - timedelta(days=rng.randint(-30, 365 * args.years))
+                planned = day > today
+                session_rows.append({
+                    "project_id": project_id,
+                    "date": day,
+                    "style": 0 if planned else rng.choices([0, 1, 2], weights=[8, 1, 2])[0],
+                    "planned": planned,
+                    "notes": "",
+                })
+            if len(session_rows) >= BATCH_SIZE:
+                _insert(db, Session, session_rows)
+                session_rows = []
+        _insert(db, Session, session_rows)
+        timings["sessions_s"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for start in range(0, len(project_ids), BATCH_SIZE):
+            Project.refresh_summaries(project_ids[start:start + BATCH_SIZE])
+        for user_id in user_ids:
+            SessionRollup.rebuild(user_id)
+        db.session.commit()
+        timings["summaries_s"] = time.perf_counter() - t
+
+        session_count = db.session.scalar(
+            db.select(db.func.count(Session.id))
+            .join(Project, Session.project_id == Project.id)
+            .where(Project.user_id.in_(user_ids))
+        )
+
+    print(
+        f"Seeded {len(user_ids)} users, {len(location_ids)} locations, "
+        f"{len(project_ids)} projects, {session_count} sessions."
+    )
+    for key, seconds in timings.items():
+        print(f"{key:>20}: {seconds:8.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=200, help="projects per user")
+    parser.add_argument("--sessions", type=int, default=25, help="mean sessions per project")
+    parser.add_argument("--locations", type=int, default=300)
+    parser.add_argument("--years", type=int, default=5, help="history depth in years")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="delete earlier bench data first")
+    seed(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Serialization cost per 10k sessions, before and after the fast path.
+
+    python -m bench.serialize --sessions 10000 --runs 7
+
+Builds unsaved sessions/projects/locations in memory (no database needed)
+and times the two halves of an /ascents or /stream response separately:
+turning rows into dicts, then encoding the list to JSON. "legacy" is the
+serializer as it was before label tables and the stored short state name (literal
+dicts and string parsing on every row, over ORM objects); "current" is
+routes.ascents over the column rows its query returns. Each is encoded with the stdlib provider and, when installed, with orjson.
+"""
+import argparse
+import gc
+import random
+import statistics
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from models.country import short_state_name
+
+REGIONS = [
+    ("US", "US-CA", "California"), ("US", "US-CO", "Colorado"),
+    ("CN", "CN-GX", "Guangxi Zhuangzu Zizhiqu"), ("ES", "ES-CT", "Catalunya"),
+    ("ZA", "ZA-WC", "Western Cape"), ("FR", "", ""),
+]
+
+
+def _legacy_session_to_dict(session, project):
+    loc = project.location
+    return {
+        "date": session.date.isoformat() if session.date else None,
+        "style": session.style,
+        "style_label": {0: "Attempt", 1: "Flash", 2: "Send"}.get(session.style, "Attempt"),
+        "project_name": project.name,
+        "grade": project.grade,
+        "type": project.type,
+        "type_label": {0: "Sport", 1: "Boulder", 2: "Trad"}.get(project.type, "Unknown"),
+        "location": {
+            "crag": loc.crag if loc else "",
+            "state_name": loc.state_name if loc else "",
+            # was a property re-parsing the state fields on every access
+            "state_short": short_state_name(loc.country_code, loc.state_code, loc.state_name) if loc else "",
+        } if loc else None,
+        "notes": session.notes or "",
+    }
+
+
+def _rows(n, seed):
+    from models import Country, Location, Project, Session, Subdivision
+
+    rng = random.Random(seed)
+    countries = {}
+    locations = []
+    for i, (country_code, state_code, state_name) in enumerate(REGIONS * 10):
+        country = countries.setdefault(country_code, Country(code=country_code, name=country_code))
+        subdivision = Subdivision(
+            code=state_code, name=state_name,
+            short_name=short_state_name(country_code, state_code, state_name),
+        ) if state_code else None
+        loc = Location(country=country, subdivision=subdivision, area=f"Area {i}", crag=f"Crag {i}")
+        locations.append(loc)
+    projects = [
+        Project(
+            name=f"Problem {i}", grade="V5", type=rng.randint(0, 2),
+            location=rng.choice(locations) if rng.random() < 0.9 else None,
+        )
+        for i in range(max(n // 20, 1))
+    ]
+    today = date.today()
+    rows = []
+    for _ in range(n):
+        session = Session(
+            date=today - timedelta(days=rng.randint(0, 1000)),
+            style=rng.randint(0, 2), notes="" if rng.random() < 0.7 else "felt good",
+        )
+        rows.append((session, rng.choice(projects)))
+    return rows
+
+
+def _column_rows(rows):
+    """The same data as routes.ascents.SESSION_COLUMNS rows."""
+    from routes.ascents import SESSION_COLUMNS
+
+    Row = namedtuple("Row", [c.key for c in SESSION_COLUMNS])
+    out = []
+    for session, project in rows:
+        loc = project.location
+        out.append(Row(
+            id=None, date=session.date, style=session.style, notes=session.notes,
+            project_name=project.name, grade=project.grade, type=project.type,
+            location_id=1 if loc else None,
+            crag=loc.crag if loc else None,
+            state_name=loc.state_name if loc else None,
+            state_short=loc.state_short if loc else None,
+        ))
+    return out
+
+
+def _best_ms(fn, runs):
+    times = []
+    gc.collect()
+    gc.disable()  # as timeit does: collections would land on whichever run is unlucky
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import app
+    from jsonprovider import OrjsonProvider, orjson
+    from routes.ascents import _session_to_dict
+
+    rows = _rows(args.sessions, args.seed)
+    column_rows = _column_rows(rows)
+    per = 10000 / args.sessions
+    encoders = [("stdlib", DefaultJSONProvider(app))]
+    if orjson is not None:
+        encoders.append(("orjson", OrjsonProvider(app)))
+
+    print(f"{args.sessions} sessions, best/median of {args.runs} runs, ms per 10k sessions")
+    print(f"{'serializer':<10} {'encoder':<8} {'build':>16} {'encode':>16} {'total':>16}")
+    baseline = None
+    variants = [
+        ("legacy", lambda: [_legacy_session_to_dict(s, p) for s, p in rows]),
+        ("current", lambda: [_session_to_dict(row) for row in column_rows]),
+    ]
+    for name, build_items in variants:
+        build = _best_ms(build_items, args.runs)
+        items = build_items()
+        for encoder_name, provider in encoders:
+            encode = _best_ms(lambda: provider.dumps({"items": items, "next": None}), args.runs)
+            total = build[0] + encode[0]
+            baseline = baseline or total
+            print(
+                f"{name:<10} {encoder_name:<8} "
+                f"{build[0] * per:7.1f}/{build[1] * per:7.1f} "
+                f"{encode[0] * per:7.1f}/{encode[1] * per:7.1f} "
+                f"{total * per:9.1f} ({baseline / total:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Startup benchmark: time-to-first-200 for a fresh app process.
+
+Spawns a new interpreter per run, imports the app module (which builds the
+Flask app) and serves /health, then /api/countries for the cost of the
+first catalog-backed request. Reports the median of each phase:
+
+    python -m bench.startup --runs 10 --out startup.json
+
+``--warm`` calls catalog.warm() before the first request, which is what
+the gunicorn master does before forking workers.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t_import = time.perf_counter()
+if "--warm" in sys.argv:
+    import catalog
+    catalog.warm()
+t_warm = time.perf_counter()
+client = app_module.app.test_client()
+r = client.get("/health")
+assert r.status_code == 200, r.status_code
+t_health = time.perf_counter()
+r = client.get("/api/countries")
+assert r.status_code == 200, r.status_code
+t_countries = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "warm_ms": (t_warm - t_import) * 1000,
+    "first_health_ms": (t_health - t_warm) * 1000,
+    "first_countries_ms": (t_countries - t_health) * 1000,
+}))
+"""
+
+
+def run_once(warm):
+    args = [sys.executable, "-c", CHILD] + (["--warm"] if warm else [])
+    start = time.perf_counter()
+    proc = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True)
+    # The child prints its phases after the second request; the wall clock
+    # also covers interpreter startup.
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_to_first_200_ms"] = (time.perf_counter() - start) * 1000 - result["first_countries_ms"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="warm the catalog before the first request")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    runs = [run_once(args.warm) for _ in range(args.runs)]
+    summary = {
+        key: round(statistics.median(r[key] for r in runs), 1)
+        for key in runs[0]
+    }
+    report = {"runs": args.runs, "warm": args.warm, "median_ms": summary}
+    for key, value in summary.items():
+        print(f"{key:>26}: {value:8.1f} ms")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Small in-process caches for hot lookups.
+
+Each worker process has its own copy; entries expire after a short TTL so
+changes made through another worker are picked up without coordination.
+Changes committed through this process drop the affected entries at once.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from models import db, User
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60          # seconds
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# ---------------------------------------------------------------------------
+# Users
+# ---------------------------------------------------------------------------
+
+# id -> detached User snapshot, and username -> id
+_users = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+_user_ids = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+# Never cached: bump_data_version_where updates it in bulk, past the flush
+# hook below, so a copy would go stale. Merged users load it when read.
+_UNCACHED = {"data_version"}
+
+_STALE = "cache_stale_users"        # db session info: (id, usernames) to drop on commit
+
+
+def get_user(user_id):
+    """Return the User with this id, attached to the current db session."""
+    snapshot = _users.get(user_id)
+    if snapshot is not None:
+        # load=False attaches a copy of the snapshot without a SELECT
+        return db.session.merge(snapshot, load=False)
+    user = db.session.get(User, user_id)
+    if user is not None:
+        _remember(user)
+    return user
+
+
+def get_user_by_username(username):
+    """Return the User with this username, or None."""
+    user_id = _user_ids.get(username)
+    if user_id is not None:
+        user = get_user(user_id)
+        if user is not None and user.username == username:
+            return user
+    user = User.query.filter_by(username=username).first()
+    if user is not None:
+        _remember(user)
+    return user
+
+
+def invalidate_user(user_id, *usernames):
+    """Drop any cached entries for a user after its row changes."""
+    _users.pop(user_id)
+    for username in usernames:
+        _user_ids.pop(username)
+
+
+@event.listens_for(FlaskSession, "after_flush")
+def _after_flush(session, flush_context):
+    # Renames, profile edits and deletions; the old username goes too
+    stale = session.info.setdefault(_STALE, [])
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            history = inspect(obj).attrs.username.history
+            stale.append((obj.id, history.sum()))
+
+
+@event.listens_for(FlaskSession, "after_commit")
+def _after_commit(session):
+    for user_id, usernames in session.info.pop(_STALE, ()):
+        invalidate_user(user_id, *usernames)
+
+
+@event.listens_for(FlaskSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_STALE, None)
+
+
+def _remember(user):
+    # Cache a detached copy, never the session-bound instance itself: it
+    # must outlive this request's session and be safe to share across threads.
+    snapshot = User(**{
+        attr.key: getattr(user, attr.key)
+        for attr in User.__mapper__.column_attrs
+        if attr.key not in _UNCACHED
+    })
+    make_transient_to_detached(snapshot)
+    _users.set(user.id, snapshot)
+    _user_ids.set(user.username, user.id)
@@ -0,0 +1,104 @@
+"""ISO 3166 country and subdivision reference data (from pycountry).
+
+The data only changes when pycountry is upgraded, so everything here is
+built once per process: dict indexes for lookups and validation, and the
+pre-serialized JSON bodies served by /api/countries.
+
+pycountry is imported on first use, keeping it off the startup path. Under
+gunicorn, warm() runs in the master before workers fork (see
+gunicorn.conf.py), so the workers share one copy-on-write build.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def countries():
+    """Map alpha-2 code -> country name, in name order."""
+    import pycountry
+
+    return {
+        c.alpha_2: c.name
+        for c in sorted(pycountry.countries, key=lambda c: c.name)
+    }
+
+
+@lru_cache(maxsize=None)
+def subdivisions():
+    """Map ISO 3166-2 code -> {"code", "name", "type", "country_code"}."""
+    import pycountry
+
+    return {
+        s.code: {"code": s.code, "name": s.name, "type": s.type, "country_code": s.country_code}
+        for s in pycountry.subdivisions
+    }
+
+
+def country_name(code):
+    """Return the country name for an alpha-2 code, or None if unknown."""
+    return countries().get((code or "").upper())
+
+
+def subdivision(code):
+    """Return the subdivision dict for an ISO 3166-2 code, or None if unknown."""
+    return subdivisions().get((code or "").upper())
+
+
+@lru_cache(maxsize=None)
+def _names():
+    country_codes = {name.lower(): code for code, name in countries().items()}
+    subdivision_codes = {
+        (sub["country_code"], sub["name"].lower()): sub["code"]
+        for sub in subdivisions().values()
+    }
+    return country_codes, subdivision_codes
+
+
+def country_code_by_name(name):
+    """Return the alpha-2 code for an exact (case-insensitive) country name, or None."""
+    return _names()[0].get((name or "").strip().lower())
+
+
+def subdivision_by_name(country_code, name):
+    """Return the subdivision dict named ``name`` within a country, or None."""
+    code = _names()[1].get(((country_code or "").upper(), (name or "").strip().lower()))
+    return subdivisions()[code] if code else None
+
+
+def _payload(data):
+    body = json.dumps(data, separators=(",", ":")).encode()
+    return body, hashlib.sha1(body).hexdigest()[:20]
+
+
+@lru_cache(maxsize=None)
+def countries_payload():
+    """(JSON bytes, strong ETag) for the full country list."""
+    return _payload([{"code": code, "name": name} for code, name in countries().items()])
+
+
+@lru_cache(maxsize=None)
+def _subdivision_payloads():
+    by_country = {}
+    for sub in sorted(subdivisions().values(), key=lambda s: s["name"]):
+        by_country.setdefault(sub["country_code"], []).append(
+            {"code": sub["code"], "name": sub["name"], "type": sub["type"]}
+        )
+    return {code: _payload(subs) for code, subs in by_country.items()}
+
+
+_EMPTY_PAYLOAD = _payload([])
+
+
+def subdivisions_payload(country_code):
+    """(JSON bytes, strong ETag) for one country's subdivisions, by name."""
+    return _subdivision_payloads().get((country_code or "").upper(), _EMPTY_PAYLOAD)
+
+
+def warm():
+    """Build every index and payload now rather than on first request."""
+    countries()
+    subdivisions()
+    countries_payload()
+    _subdivision_payloads()
+    _names()
@@ -0,0 +1,81 @@
+import click
+import assets
+import jobs
+from models import db, Job, Project, SessionRollup, User
+from models.job import JOB_FAILED, JOB_STATUSES
+
+
+def register_commands(app):
+    """Attach the project's `flask` CLI commands to the app."""
+
+    @app.cli.command("sweep-on-hold")
+    def sweep_on_hold():
+        """Move projects with no session in 180 days from Projecting to On Hold."""
+        count = Project.sweep_on_hold()
+        db.session.commit()
+        click.echo(f"Moved {count} project(s) to On Hold.")
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--user", "username", default=None, help="Only rebuild this user's rollups.")
+    def rebuild_rollups(username):
+        """Recompute the yearly session rollups from the sessions table."""
+        user_id = None
+        if username:
+            user = User.query.filter_by(username=username).first()
+            if not user:
+                raise click.ClickException(f"User '{username}' not found.")
+            user_id = user.id
+        count = SessionRollup.rebuild(user_id)
+        db.session.commit()
+        click.echo(f"Rebuilt {count} rollup row(s).")
+
+    @app.cli.group("assets")
+    def assets_group():
+        """Build fingerprinted, pre-compressed static assets."""
+
+    @assets_group.command("build")
+    def build_assets():
+        """Write hashed copies of static/ (plus .gz/.br variants) to static/dist/."""
+        manifest = assets.build()
+        if assets.brotli is None:
+            click.echo("brotli not installed; wrote gzip variants only.")
+        click.echo(f"Built {len(manifest)} asset(s) into {assets.DIST_DIR}.")
+
+    @app.cli.group("jobs")
+    def jobs_group():
+        """Inspect and run queued background jobs."""
+
+    @jobs_group.command("drain")
+    @click.option("--retry-failed", is_flag=True, help="Requeue failed jobs first.")
+    def drain_jobs(retry_failed):
+        """Run every outstanding job now, including retries still in backoff."""
+        if retry_failed:
+            click.echo(f"Requeued {jobs.requeue_failed()} failed job(s).")
+        ran = jobs.run_due(app, include_scheduled=True)
+        failed = Job.query.filter_by(status=JOB_FAILED).count()
+        click.echo(f"Ran {ran} job(s); {failed} failed job(s) left.")
+
+    @jobs_group.command("list")
+    @click.option("--limit", default=20, show_default=True, help="Most jobs to show.")
+    def list_jobs(limit):
+        """Show queue counts and the oldest outstanding jobs."""
+        counts = (
+            db.session.query(Job.kind, Job.status, db.func.count(Job.id))
+            .group_by(Job.kind, Job.status)
+            .order_by(Job.kind, Job.status)
+            .all()
+        )
+        if not counts:
+            click.echo("No jobs queued.")
+            return
+        for kind, status, n in counts:
+            click.echo(f"{kind:<16} {JOB_STATUSES.get(status, status):<8} {n}")
+        click.echo("")
+        for job in Job.query.order_by(Job.created_at, Job.id).limit(limit):
+            line = (
+                f"#{job.id} {job.key} {JOB_STATUSES.get(job.status, job.status).lower()} "
+                f"attempts={job.attempts} run_after={job.run_after:%Y-%m-%d %H:%M:%S}"
+            )
+            if job.last_error:
+                line += f" error={job.last_error}"
+            click.echo(line)
@@ -0,0 +1,146 @@
+"""Engine and connection-pool configuration, driven by environment variables.
+
+Only applies to PostgreSQL; other URLs (SQLite for local experiments) keep
+SQLAlchemy's defaults.
+
+    DB_POOL_SIZE            persistent connections per worker (5)
+    DB_MAX_OVERFLOW         extra connections under burst load (10)
+    DB_POOL_TIMEOUT         seconds to wait for a free connection (30)
+    DB_POOL_RECYCLE         seconds before a connection is replaced (1800)
+    DB_POOL_PRE_PING        1 to test connections on checkout (1)
+    DB_STATEMENT_TIMEOUT_MS server-side statement_timeout, 0 for none (0)
+    DB_PGBOUNCER            1 when DATABASE_URL points at PgBouncer in
+                            transaction-pooling mode (0)
+
+In PgBouncer mode PgBouncer does the pooling, so the app holds no idle
+connections (NullPool), and the statement timeout is applied per
+transaction with SET LOCAL: PgBouncer rejects the startup ``options``
+parameter, and a session-level SET would leak to whichever client gets that
+server connection next.
+
+Each worker's pool is instrumented (InstrumentedQueuePool) and reported by
+pool_stats(), served at /health/pool.
+"""
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+log = logging.getLogger("kexian.db")
+
+# Checkouts that wait at least this long for a connection are logged
+SLOW_CHECKOUT_MS = 100
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def is_postgres(url):
+    return url.startswith("postgresql")
+
+
+def pgbouncer_mode():
+    return os.environ.get("DB_PGBOUNCER") == "1"
+
+
+def statement_timeout_ms():
+    return _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``url`` from the environment."""
+    if not is_postgres(url):
+        return {}
+    options = {"pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1"}
+    if pgbouncer_mode():
+        options["poolclass"] = NullPool
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+    )
+    timeout = statement_timeout_ms()
+    if timeout:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def init_app(app, db):
+    """Attach per-transaction settings that can't go in engine options."""
+    url = app.config["SQLALCHEMY_DATABASE_URI"]
+    timeout = statement_timeout_ms()
+    if not (is_postgres(url) and pgbouncer_mode() and timeout):
+        return
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "begin")
+    def _set_local_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            log.warning("pool exhausted: no connection within %ss (%s)", self._timeout, self.status())
+            raise
+        waited = time.perf_counter() - start
+        slow = waited * 1000 >= SLOW_CHECKOUT_MS
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.slow_checkouts += slow
+        if slow:
+            log.warning("waited %.0f ms for a connection (%s)", waited * 1000, self.status())
+        return conn
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+def pool_stats(engine):
+    """Point-in-time numbers for this worker's pool."""
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats())
+    return stats
@@ -0,0 +1,41 @@
+"""Gunicorn settings and server hooks (loaded with `gunicorn -c gunicorn.conf.py`).
+
+Bind address, worker count and logging stay on the command line in the
+Dockerfile; this file holds what has to run as code.
+"""
+import gc
+
+# Import the app once in the master so workers fork from a loaded process.
+preload_app = True
+
+
+def when_ready(server):
+    """Master, after the app is loaded and before any worker forks.
+
+    Builds the pycountry catalog here so every worker shares one copy of it
+    copy-on-write instead of each parsing the ISO databases on first use,
+    then freezes the GC so collections in the workers don't touch (and so
+    copy) the pages holding these long-lived objects.
+    """
+    import catalog
+
+    catalog.warm()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Worker, right after the fork.
+
+    Drop any pooled connections inherited from the master: sharing a socket
+    between processes corrupts both sides' protocol state. close=False
+    leaves them open for the master rather than closing them from here.
+    Then start the worker's background job threads, so jobs left over from
+    a previous deploy run without waiting for a new write.
+    """
+    from app import app
+    import jobs
+    from models import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    jobs.start(app)
@@ -0,0 +1,253 @@
+"""Background jobs: derived-data maintenance off the request path.
+
+A write calls enqueue() inside its own transaction, so the Job row commits
+or rolls back with the change it follows up on. Once the transaction
+commits, this process's thread pool picks the job up and the response
+goes out without waiting for it. Handlers recompute from the source
+tables rather than apply deltas, so running a job twice is harmless and
+a failed one can simply be retried.
+
+- Dedupe: a job's ``key`` names what it recomputes. Enqueueing a key that
+  is already pending reschedules that job instead of adding another.
+- Serial per key: a job isn't claimed while another with its key is
+  running, so two threads never recompute the same rows at once; it runs
+  once that one is done.
+- Retry: a failing job is retried with exponential backoff, up to
+  MAX_ATTEMPTS, then kept as failed for ``flask jobs list``.
+- Crashes: a claimed job holds a lease; if its process dies, the poller
+  in any process picks it up again once the lease runs out.
+- ``flask jobs drain`` runs everything outstanding in the foreground.
+
+Settings (app.config, from the environment in app.py):
+
+    JOBS_EAGER    run jobs in the committing thread, right after the
+                  commit; for scripts and local debugging (off)
+    JOBS_WORKERS  pool threads per process (2)
+
+Under gunicorn each worker starts its pool in post_fork; otherwise it
+starts with the first job.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, exc
+from flask_sqlalchemy.session import Session as FlaskSession
+
+from models import db, Job, SessionRollup, User
+from models.job import JOB_PENDING, JOB_RUNNING, JOB_FAILED
+
+log = logging.getLogger("kexian.jobs")
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 5                 # before the 2nd attempt; doubles after each failure
+LEASE = timedelta(minutes=5)        # a claimed job not finished by then is run again
+POLL_SECONDS = 30                   # how often each process looks for due jobs
+
+# kind -> function(**payload)
+HANDLERS = {}
+
+_ENQUEUED = "jobs_enqueued"         # db session info flag: wake the runner on commit
+
+_app = None
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def handler(kind):
+    """Register the decorated function as the handler for ``kind`` jobs."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def init_app(app):
+    global _app
+    _app = app
+    app.config.setdefault("JOBS_EAGER", False)
+    app.config.setdefault("JOBS_WORKERS", 2)
+
+
+def enqueue(kind, key, **payload):
+    """Schedule a ``kind`` job to run with ``payload`` once this transaction commits.
+
+    If a job with ``key`` is already pending (waiting, or in retry
+    backoff), it is moved up to run now instead of adding a second one.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    now = datetime.utcnow()
+    reschedule = (
+        db.update(Job)
+        .where(Job.key == key, Job.status == JOB_PENDING)
+        .values(payload=payload, run_after=now)
+        .execution_options(synchronize_session=False)
+    )
+    for _ in range(2):
+        # The UPDATE also locks the row, so a runner can't claim it until
+        # this transaction commits and the job sees this write's data
+        if db.session.execute(reschedule).rowcount:
+            break
+        try:
+            with db.session.begin_nested():
+                db.session.add(Job(kind=kind, key=key, payload=payload, run_after=now))
+            break
+        except exc.IntegrityError:
+            continue  # a concurrent transaction inserted it first; reschedule theirs
+    db.session.info[_ENQUEUED] = True
+
+
+@event.listens_for(FlaskSession, "after_commit")
+def _after_commit(session):
+    if session.info.pop(_ENQUEUED, False) and _app is not None:
+        if _app.config["JOBS_EAGER"]:
+            run_due(_app)
+        else:
+            start(_app).submit(run_due, _app)
+
+
+@event.listens_for(FlaskSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_ENQUEUED, None)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def start(app):
+    """Start this process's job threads and poller, if not running; return the pool."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited through fork has no threads behind it
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=app.config["JOBS_WORKERS"], thread_name_prefix="jobs")
+            _pool_pid = os.getpid()
+            threading.Thread(target=_poll, args=(app, _pool), name="jobs-poll", daemon=True).start()
+        return _pool
+
+
+def _poll(app, pool):
+    # Retries that came due and jobs orphaned by other processes
+    while True:
+        time.sleep(POLL_SECONDS)
+        try:
+            pool.submit(run_due, app)
+        except RuntimeError:
+            return  # pool shut down at interpreter exit
+
+
+def run_due(app, include_scheduled=False):
+    """Run due jobs in a fresh app context until none is left; return how many ran."""
+    ran = 0
+    with app.app_context():
+        while True:
+            outcome = run_next(include_scheduled)
+            if outcome is None:
+                return ran
+            ran += outcome
+
+
+def run_next(include_scheduled=False):
+    """Claim and run one due job.
+
+    Returns None when no job is due, False when another thread claimed the
+    job first, else True. ``include_scheduled`` also takes pending jobs
+    still in retry backoff.
+    """
+    now = datetime.utcnow()
+    pending = Job.status == JOB_PENDING
+    if not include_scheduled:
+        pending = db.and_(pending, Job.run_after <= now)
+    # Enqueued while the same key was running: wait for that run to finish
+    # (an abandoned one is claimed again first, below)
+    running = db.aliased(Job)
+    pending = db.and_(pending, ~db.exists().where(running.key == Job.key, running.status == JOB_RUNNING))
+    abandoned = db.and_(Job.status == JOB_RUNNING, Job.run_after <= now)
+    job = db.session.scalars(
+        db.select(Job).where(db.or_(pending, abandoned)).order_by(Job.run_after, Job.id).limit(1)
+    ).first()
+    if job is None:
+        db.session.rollback()
+        return None
+    job_id, kind, key, payload, attempt = job.id, job.kind, job.key, job.payload, job.attempts + 1
+    # Only one runner's UPDATE matches the row as it was read
+    claimed = db.session.execute(
+        db.update(Job)
+        .where(Job.id == job_id, Job.status == job.status, Job.run_after == job.run_after)
+        .values(status=JOB_RUNNING, attempts=attempt, run_after=now + LEASE)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return False
+
+    started = time.perf_counter()
+    try:
+        if kind not in HANDLERS:
+            raise LookupError(f"No handler for job kind '{kind}'")
+        HANDLERS[kind](**payload)
+        db.session.execute(db.delete(Job).where(Job.id == job_id))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log.exception("job %s %s failed (attempt %d)", kind, key, attempt)
+        _retry_or_fail(job_id, attempt, f"{type(e).__name__}: {e}")
+    else:
+        log.info("job %s %s done in %.1f ms", kind, key, (time.perf_counter() - started) * 1000)
+    return True
+
+
+def _retry_or_fail(job_id, attempt, error):
+    if attempt >= MAX_ATTEMPTS:
+        values = {"status": JOB_FAILED}
+    else:
+        backoff = timedelta(seconds=BACKOFF_SECONDS * 2 ** (attempt - 1))
+        values = {"status": JOB_PENDING, "run_after": datetime.utcnow() + backoff}
+    update = db.update(Job).where(Job.id == job_id).values(last_error=error, **values)
+    try:
+        db.session.execute(update)
+        db.session.commit()
+    except exc.IntegrityError:
+        # The key was enqueued again while this ran; that job redoes the work
+        db.session.rollback()
+        db.session.execute(db.delete(Job).where(Job.id == job_id))
+        db.session.commit()
+
+
+def requeue_failed():
+    """Make every failed job pending again with fresh attempts; return the count."""
+    failed = db.session.scalars(db.select(Job).where(Job.status == JOB_FAILED)).all()
+    pending = set(db.session.scalars(
+        db.select(Job.key).where(Job.status == JOB_PENDING, Job.key.in_([j.key for j in failed]))
+    ))
+    for job in failed:
+        if job.key in pending:
+            db.session.delete(job)  # already queued again
+        else:
+            job.status, job.attempts, job.run_after = JOB_PENDING, 0, datetime.utcnow()
+            pending.add(job.key)
+    db.session.commit()
+    return len(failed)
+
+
+# ---------------------------------------------------------------------------
+# Handlers
+# ---------------------------------------------------------------------------
+
+def queue_rollups(user_id, years):
+    """Queue a recompute of ``user_id``'s session rollups for each of ``years``."""
+    for year in sorted(set(years)):
+        enqueue("rollups", f"rollups:{user_id}:{year}", user_id=user_id, year=year)
+
+
+@handler("rollups")
+def _rebuild_rollups(user_id, year=None):
+    SessionRollup.rebuild(user_id, year)
+    # Year totals and ascents changed after the write's own bump
+    User.bump_data_version_where(User.id == user_id)
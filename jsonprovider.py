@@ -0,0 +1,53 @@
+"""Fast JSON encoding for responses, with the stdlib encoder as fallback.
+
+When the optional ``orjson`` package is installed (``uv sync --extra
+speedups``; the Docker image always has it) OrjsonProvider replaces Flask's
+default provider for jsonify(), ``tojson`` in templates and the streaming
+endpoints. Output matches the stdlib provider's: sorted keys, integer keys
+as strings, dates through Flask's default() (HTTP dates), pretty-printed in
+debug mode. Without orjson Flask's DefaultJSONProvider is used unchanged.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes and decodes with orjson."""
+
+    def _options(self, pretty=False, sort_keys=None):
+        # Dates go through default() so they serialize as the stdlib provider does
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # Jinja's tojson passes sort_keys=True; anything else (indent=, cls=
+        # ...) is an option orjson doesn't take
+        sort_keys = kwargs.pop("sort_keys", None)
+        if kwargs:
+            return super().dumps(obj, sort_keys=self.sort_keys if sort_keys is None else sort_keys, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(sort_keys=sort_keys)).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Install OrjsonProvider on ``app`` when orjson is available."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,63 @@
+"""add state short to locations
+
+Revision ID: 3f0c9a2d61b7
+Revises: 91454302bfff
+Create Date: 2026-10-17 13:05:27.640193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f0c9a2d61b7'
+down_revision = '91454302bfff'
+branch_labels = None
+depends_on = None
+
+
+def _short_state_name(country_code, state_code, state_name):
+    # Frozen copy of models.location.short_state_name as of this revision
+    if not state_name:
+        return ""
+    if country_code == "US" and state_code and "-" in state_code:
+        suffix = state_code.split("-", 1)[1]
+        if suffix.isalpha() and len(suffix) <= 3:
+            return suffix.upper()
+    first = state_name.split()[0]
+    if first != state_name:
+        return first
+    return state_name
+
+
+def upgrade():
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('state_short', sa.String(), nullable=False, server_default=''))
+
+    # Backfill once per distinct state rather than once per location
+    bind = op.get_bind()
+    locations = sa.table(
+        'locations',
+        sa.column('country_code', sa.String),
+        sa.column('state_code', sa.String),
+        sa.column('state_name', sa.String),
+        sa.column('state_short', sa.String),
+    )
+    states = bind.execute(
+        sa.select(locations.c.country_code, locations.c.state_code, locations.c.state_name)
+        .where(locations.c.state_name != '')
+        .distinct()
+    ).all()
+    for country_code, state_code, state_name in states:
+        bind.execute(
+            locations.update()
+            .where(locations.c.country_code == country_code)
+            .where(locations.c.state_code == state_code)
+            .where(locations.c.state_name == state_name)
+            .values(state_short=_short_state_name(country_code, state_code, state_name))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.drop_column('state_short')
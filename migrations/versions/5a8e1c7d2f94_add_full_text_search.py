@@ -0,0 +1,67 @@
+"""add full text search
+
+Revision ID: 5a8e1c7d2f94
+Revises: 3f0c9a2d61b7
+Create Date: 2026-10-17 13:48:52.305716
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8e1c7d2f94'
+down_revision = '3f0c9a2d61b7'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of search.PG_VECTORS / search.FTS_COLUMNS as of this revision
+PG_VECTORS = {
+    'projects': "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+    'sessions': "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+    'locations': "setweight(to_tsvector('simple', coalesce(area, '')), 'A') || "
+                 "setweight(to_tsvector('simple', coalesce(crag, '')), 'A')",
+}
+FTS_COLUMNS = {
+    'projects': ['name', 'notes'],
+    'sessions': ['notes'],
+    'locations': ['area', 'crag'],
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table, vector in PG_VECTORS.items():
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            )
+            op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        for table, columns in FTS_COLUMNS.items():
+            cols = ', '.join(columns)
+            new = ', '.join(f'new.{c}' for c in columns)
+            old = ', '.join(f'old.{c}' for c in columns)
+            fts = f'{table}_fts'
+            delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+            insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id')")
+            op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+            op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+            op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END")
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in PG_VECTORS:
+            op.execute(f"DROP INDEX ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+    elif dialect == 'sqlite':
+        for table in FTS_COLUMNS:
+            fts = f'{table}_fts'
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER {fts}_{suffix}")
+            op.execute(f"DROP TABLE {fts}")
@@ -0,0 +1,26 @@
+"""add data version to users
+
+Revision ID: 91454302bfff
+Revises: b68a19b89ba2
+Create Date: 2026-10-17 12:40:09.117835
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '91454302bfff'
+down_revision = 'b68a19b89ba2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
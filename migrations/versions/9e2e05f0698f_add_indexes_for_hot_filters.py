@@ -0,0 +1,36 @@
+"""add indexes for hot filters
+
+Revision ID: 9e2e05f0698f
+Revises: eff687a51f87
+Create Date: 2026-10-17 10:03:17.284519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2e05f0698f'
+down_revision = 'eff687a51f87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_projects_location_id', ['location_id'], unique=False)
+        batch_op.create_index('ix_projects_status_last_session_date', ['status', 'last_session_date'], unique=False)
+
+    with op.batch_alter_table('sessions', schema=None) as batch_op:
+        batch_op.create_index('ix_sessions_project_id_planned_date', ['project_id', 'planned', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_sessions_project_id_planned_date')
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_status_last_session_date')
+        batch_op.drop_index('ix_projects_location_id')
+        batch_op.drop_index('ix_projects_user_id_created_at')
@@ -0,0 +1,75 @@
+"""add session rollups
+
+Revision ID: b68a19b89ba2
+Revises: 9e2e05f0698f
+Create Date: 2026-10-17 11:26:54.903112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b68a19b89ba2'
+down_revision = '9e2e05f0698f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('session_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('type', sa.Integer(), nullable=False),
+    sa.Column('grade', sa.String(), nullable=False),
+    sa.Column('style', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'type', 'grade', 'style')
+    )
+
+    # Backfill from existing non-planned sessions
+    from sqlalchemy.sql import table, column
+
+    sessions_t = table('sessions',
+        column('id', sa.Integer),
+        column('project_id', sa.Integer),
+        column('date', sa.Date),
+        column('style', sa.Integer),
+        column('planned', sa.Boolean),
+    )
+    projects_t = table('projects',
+        column('id', sa.Integer),
+        column('user_id', sa.Integer),
+        column('type', sa.Integer),
+        column('grade', sa.String),
+    )
+    rollups_t = table('session_rollups',
+        column('user_id', sa.Integer),
+        column('year', sa.Integer),
+        column('type', sa.Integer),
+        column('grade', sa.String),
+        column('style', sa.Integer),
+        column('count', sa.Integer),
+    )
+    year = sa.cast(sa.extract('year', sessions_t.c.date), sa.Integer)
+    grouped = (
+        sa.select(
+            projects_t.c.user_id,
+            year,
+            projects_t.c.type,
+            projects_t.c.grade,
+            sessions_t.c.style,
+            sa.func.count(sessions_t.c.id),
+        )
+        .select_from(sessions_t.join(projects_t, sessions_t.c.project_id == projects_t.c.id))
+        .where(sessions_t.c.planned == sa.false())
+        .group_by(projects_t.c.user_id, year, projects_t.c.type, projects_t.c.grade, sessions_t.c.style)
+    )
+    op.execute(rollups_t.insert().from_select(
+        ['user_id', 'year', 'type', 'grade', 'style', 'count'], grouped
+    ))
+
+
+def downgrade():
+    op.drop_table('session_rollups')
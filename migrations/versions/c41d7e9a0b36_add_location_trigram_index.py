@@ -0,0 +1,35 @@
+"""add location trigram index
+
+Revision ID: c41d7e9a0b36
+Revises: 5a8e1c7d2f94
+Create Date: 2026-10-17 14:21:06.918342
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a0b36'
+down_revision = '5a8e1c7d2f94'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of search.LOCATION_TEXT as of this revision
+LOCATION_TEXT = (
+    "lower(area || ' ' || coalesce(crag, '') || ' ' || "
+    "coalesce(state_name, '') || ' ' || state_short)"
+)
+
+
+def upgrade():
+    # Postgres only: SQLite has no trigram indexes and scans its few local rows
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX ix_locations_text_trgm ON locations USING gin (({LOCATION_TEXT}) gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX ix_locations_text_trgm")
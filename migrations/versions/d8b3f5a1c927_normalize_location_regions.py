@@ -0,0 +1,138 @@
+"""normalize location regions
+
+Revision ID: d8b3f5a1c927
+Revises: c41d7e9a0b36
+Create Date: 2026-10-17 14:52:38.204716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b3f5a1c927'
+down_revision = 'c41d7e9a0b36'
+branch_labels = None
+depends_on = None
+
+REGION_COLUMNS = ['country_code', 'country_name', 'state_code', 'state_name', 'state_short']
+
+# Frozen copies of search.LOCATION_TEXT before and after this revision
+OLD_LOCATION_TEXT = (
+    "lower(area || ' ' || coalesce(crag, '') || ' ' || "
+    "coalesce(state_name, '') || ' ' || state_short)"
+)
+LOCATION_TEXT = "lower(area || ' ' || coalesce(crag, ''))"
+
+
+def _recreate_location_fts_triggers():
+    # SQLite batch mode rebuilds the locations table, which drops its triggers.
+    # Frozen copy of search.sqlite_ddl('locations') as of this revision.
+    delete = "INSERT INTO locations_fts(locations_fts, rowid, area, crag) VALUES ('delete', old.id, old.area, old.crag);"
+    insert = "INSERT INTO locations_fts(rowid, area, crag) VALUES (new.id, new.area, new.crag);"
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS locations_fts_ai AFTER INSERT ON locations BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS locations_fts_ad AFTER DELETE ON locations BEGIN {delete} END")
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS locations_fts_au AFTER UPDATE OF area, crag ON locations "
+        f"BEGIN {delete} {insert} END"
+    )
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    op.create_table('countries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=2), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    op.create_table('subdivisions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=6), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('short_name', sa.String(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['country_id'], ['countries.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    with op.batch_alter_table('subdivisions', schema=None) as batch_op:
+        batch_op.create_index('ix_subdivisions_country_id', ['country_id'], unique=False)
+
+    # Reference rows for the regions already in use, names as stored (the
+    # app adds the rest from pycountry on demand)
+    op.execute(
+        "INSERT INTO countries (code, name) "
+        "SELECT country_code, max(country_name) FROM locations GROUP BY country_code"
+    )
+    op.execute(
+        "INSERT INTO subdivisions (code, name, short_name, country_id) "
+        "SELECT l.state_code, max(l.state_name), max(l.state_short), max(c.id) "
+        "FROM locations l JOIN countries c ON c.code = l.country_code "
+        "WHERE l.state_code != '' GROUP BY l.state_code"
+    )
+
+    if dialect == 'postgresql':
+        # Its expression reads the state columns dropped below
+        op.execute("DROP INDEX ix_locations_text_trgm")
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('country_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('subdivision_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE locations SET "
+        "country_id = (SELECT id FROM countries WHERE countries.code = locations.country_code), "
+        "subdivision_id = (SELECT id FROM subdivisions WHERE subdivisions.code = locations.state_code)"
+    )
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.alter_column('country_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_locations_country_id_countries', 'countries', ['country_id'], ['id'])
+        batch_op.create_foreign_key('fk_locations_subdivision_id_subdivisions', 'subdivisions', ['subdivision_id'], ['id'])
+        batch_op.create_index('ix_locations_subdivision_id', ['subdivision_id'], unique=False)
+        batch_op.create_index('ix_locations_country_id', ['country_id'], unique=False)
+        for column in REGION_COLUMNS:
+            batch_op.drop_column(column)
+
+    if dialect == 'postgresql':
+        op.execute(f"CREATE INDEX ix_locations_text_trgm ON locations USING gin (({LOCATION_TEXT}) gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        _recreate_location_fts_triggers()
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX ix_locations_text_trgm")
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('country_code', sa.String(length=2), nullable=True))
+        batch_op.add_column(sa.Column('country_name', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('state_code', sa.String(length=6), nullable=True))
+        batch_op.add_column(sa.Column('state_name', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('state_short', sa.String(), nullable=False, server_default=''))
+    op.execute(
+        "UPDATE locations SET "
+        "country_code = (SELECT code FROM countries WHERE countries.id = locations.country_id), "
+        "country_name = (SELECT name FROM countries WHERE countries.id = locations.country_id), "
+        "state_code = coalesce((SELECT code FROM subdivisions WHERE subdivisions.id = locations.subdivision_id), ''), "
+        "state_name = coalesce((SELECT name FROM subdivisions WHERE subdivisions.id = locations.subdivision_id), ''), "
+        "state_short = coalesce((SELECT short_name FROM subdivisions WHERE subdivisions.id = locations.subdivision_id), '')"
+    )
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.alter_column('country_code', existing_type=sa.String(length=2), nullable=False)
+        batch_op.alter_column('country_name', existing_type=sa.String(), nullable=False)
+        batch_op.drop_index('ix_locations_country_id')
+        batch_op.drop_index('ix_locations_subdivision_id')
+        batch_op.drop_constraint('fk_locations_subdivision_id_subdivisions', type_='foreignkey')
+        batch_op.drop_constraint('fk_locations_country_id_countries', type_='foreignkey')
+        batch_op.drop_column('subdivision_id')
+        batch_op.drop_column('country_id')
+
+    with op.batch_alter_table('subdivisions', schema=None) as batch_op:
+        batch_op.drop_index('ix_subdivisions_country_id')
+    op.drop_table('subdivisions')
+    op.drop_table('countries')
+
+    if dialect == 'postgresql':
+        op.execute(f"CREATE INDEX ix_locations_text_trgm ON locations USING gin (({OLD_LOCATION_TEXT}) gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        _recreate_location_fts_triggers()
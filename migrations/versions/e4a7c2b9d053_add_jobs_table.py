@@ -0,0 +1,45 @@
+"""add jobs table
+
+Revision ID: e4a7c2b9d053
+Revises: d8b3f5a1c927
+Create Date: 2026-10-17 15:34:12.518930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c2b9d053'
+down_revision = 'd8b3f5a1c927'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=40), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_status_run_after', ['status', 'run_after'], unique=False)
+        batch_op.create_index(
+            'uq_jobs_pending_key', ['key'], unique=True,
+            postgresql_where=sa.text('status = 0'), sqlite_where=sa.text('status = 0'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('uq_jobs_pending_key')
+        batch_op.drop_index('ix_jobs_status_run_after')
+
+    op.drop_table('jobs')
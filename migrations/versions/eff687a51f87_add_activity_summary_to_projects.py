@@ -0,0 +1,59 @@
+"""add activity summary to projects
+
+Revision ID: eff687a51f87
+Revises: 92d664f0962c
+Create Date: 2026-10-17 09:12:41.538204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eff687a51f87'
+down_revision = '92d664f0962c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_session_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('next_session_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('first_send_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('send_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing sessions (style 1=Flash, 2=Send)
+    op.execute("""
+        UPDATE projects SET
+            last_session_date = (
+                SELECT MAX(s.date) FROM sessions s
+                WHERE s.project_id = projects.id AND s.planned = false
+            ),
+            next_session_date = (
+                SELECT MIN(s.date) FROM sessions s
+                WHERE s.project_id = projects.id AND s.planned = true
+            ),
+            first_send_date = (
+                SELECT MIN(s.date) FROM sessions s
+                WHERE s.project_id = projects.id AND s.planned = false AND s.style IN (1, 2)
+            ),
+            attempt_count = (
+                SELECT COUNT(*) FROM sessions s
+                WHERE s.project_id = projects.id AND s.planned = false AND s.style NOT IN (1, 2)
+            ),
+            send_count = (
+                SELECT COUNT(*) FROM sessions s
+                WHERE s.project_id = projects.id AND s.planned = false AND s.style IN (1, 2)
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('send_count')
+        batch_op.drop_column('attempt_count')
+        batch_op.drop_column('first_send_date')
+        batch_op.drop_column('next_session_date')
+        batch_op.drop_column('last_session_date')
@@ -20,7 +20,10 @@ PROJECT_TYPE = {
 }
 
 # Import models so they are registered with SQLAlchemy when the package loads
+from models.country import Country, Subdivision  # noqa: E402, F401
 from models.location import Location  # noqa: E402, F401
 from models.project import Project    # noqa: E402, F401
 from models.session import Session    # noqa: E402, F401
+from models.rollup import SessionRollup  # noqa: E402, F401
 from models.user import User          # noqa: E402, F401
+from models.job import Job            # noqa: E402, F401
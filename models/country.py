@@ -0,0 +1,99 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+import catalog
+from models import db
+
+
+def short_state_name(country_code, state_code, state_name):
+    """Concise state label: 'CO' for US-CO, first word for long intl names."""
+    if not state_name:
+        return ""
+    # US states – use the 2-letter abbreviation from state_code (e.g. US-CO → CO)
+    if country_code == "US" and state_code and "-" in state_code:
+        suffix = state_code.split("-", 1)[1]
+        if suffix.isalpha() and len(suffix) <= 3:
+            return suffix.upper()
+    # International: first word of the state name (e.g. "Guangxi Zhuangzu Zizhiqu" → "Guangxi")
+    first = state_name.split()[0]
+    if first != state_name:
+        return first
+    return state_name
+
+
+def _insert_missing(model, rows):
+    """Insert reference rows by code and return {code: id} for all of them.
+
+    Two requests can add the first location in the same new country or
+    state at once: codes another transaction inserted first are skipped by
+    ON CONFLICT, then every id is read back.
+    """
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    db.session.execute(dialect.insert(model).on_conflict_do_nothing(index_elements=["code"]), rows)
+    codes = [row["code"] for row in rows]
+    return dict(db.session.query(model.code, model.id).filter(model.code.in_(codes)))
+
+
+class Country(db.Model):
+    """ISO 3166-1 country, copied from the pycountry catalog on first use."""
+    __tablename__ = "countries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(2), unique=True, nullable=False)  # alpha-2, e.g. "US"
+    name = db.Column(db.String, nullable=False)                  # e.g. "United States"
+
+    @classmethod
+    def ids_for(cls, codes):
+        """Map alpha-2 codes to ids, inserting catalog countries not stored yet.
+
+        Unknown codes are left out of the result.
+        """
+        codes = {c for c in codes if catalog.country_name(c)}
+        if not codes:
+            return {}
+        ids = dict(db.session.query(cls.code, cls.id).filter(cls.code.in_(codes)))
+        missing = sorted(codes - ids.keys())
+        if missing:
+            ids.update(_insert_missing(
+                cls, [{"code": code, "name": catalog.country_name(code)} for code in missing]
+            ))
+        return ids
+
+
+class Subdivision(db.Model):
+    """ISO 3166-2 subdivision (state, province, ...), copied from pycountry on first use."""
+    __tablename__ = "subdivisions"
+    __table_args__ = (
+        db.Index("ix_subdivisions_country_id", "country_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(6), unique=True, nullable=False)  # e.g. "US-CA"
+    name = db.Column(db.String, nullable=False)                  # e.g. "California"
+    short_name = db.Column(db.String, nullable=False)            # e.g. "CA", "Guangxi"; see short_state_name
+    country_id = db.Column(db.Integer, db.ForeignKey("countries.id"), nullable=False)
+
+    @classmethod
+    def ids_for(cls, codes):
+        """Map ISO 3166-2 codes to ids, inserting catalog subdivisions not stored yet.
+
+        Unknown codes are left out of the result.
+        """
+        subs = [catalog.subdivision(c) for c in codes]
+        subs = {s["code"]: s for s in subs if s}
+        if not subs:
+            return {}
+        ids = dict(db.session.query(cls.code, cls.id).filter(cls.code.in_(subs)))
+        missing = sorted(subs.keys() - ids.keys())
+        if missing:
+            country_ids = Country.ids_for({subs[code]["country_code"] for code in missing})
+            rows = []
+            for code in missing:
+                sub = subs[code]
+                rows.append({
+                    "code": code,
+                    "name": sub["name"],
+                    "short_name": short_state_name(sub["country_code"], code, sub["name"]),
+                    "country_id": country_ids[sub["country_code"]],
+                })
+            ids.update(_insert_missing(cls, rows))
+        return ids
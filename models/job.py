@@ -0,0 +1,55 @@
+from datetime import datetime
+from models import db
+
+
+# Status constants; finished jobs are deleted rather than kept as "done"
+JOB_PENDING = 0
+JOB_RUNNING = 1
+JOB_FAILED = 2
+
+JOB_STATUSES = {JOB_PENDING: "Pending", JOB_RUNNING: "Running", JOB_FAILED: "Failed"}
+
+
+class Job(db.Model):
+    """A unit of deferred work for the runner in jobs.py.
+
+    Written in the same transaction as the change it follows up on, so the
+    work is never lost and never runs for a rolled-back write. ``key``
+    names what the job recomputes (e.g. "rollups:3:2024"): at most one job
+    per key is pending, and enqueueing again only reschedules it.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index(
+            "uq_jobs_pending_key", "key", unique=True,
+            postgresql_where=db.text("status = 0"), sqlite_where=db.text("status = 0"),
+        ),
+        # The runner's "next due job" poll
+        db.Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)              # handler name, see jobs.handler
+    key = db.Column(db.String, nullable=False)                   # dedupe key
+    payload = db.Column(db.JSON, nullable=False, default=dict)   # handler keyword arguments
+    status = db.Column(db.Integer, nullable=False, default=JOB_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Pending: not before this (retry backoff). Running: lease expiry, after
+    # which a job left behind by a dead process is picked up again.
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "payload": self.payload,
+            "status": self.status,
+            "status_label": JOB_STATUSES.get(self.status, "Unknown"),
+            "attempts": self.attempts,
+            "run_after": self.run_after.isoformat() if self.run_after else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -1,36 +1,47 @@
 from datetime import datetime
 from models import db
+from models.country import Country, Subdivision
 
 
 class Location(db.Model):
     __tablename__ = "locations"
+    __table_args__ = (
+        # list_projects ?state= and project-states join on these
+        db.Index("ix_locations_subdivision_id", "subdivision_id"),
+        db.Index("ix_locations_country_id", "country_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    country_code = db.Column(db.String(2), nullable=False)      # ISO 3166-1 alpha-2, e.g. "US"
-    country_name = db.Column(db.String, nullable=False)          # e.g. "United States"
-    state_code = db.Column(db.String(6), default="")             # ISO 3166-2, e.g. "US-CA"
-    state_name = db.Column(db.String, default="")                # e.g. "California"
+    country_id = db.Column(db.Integer, db.ForeignKey("countries.id"), nullable=False)
+    subdivision_id = db.Column(db.Integer, db.ForeignKey("subdivisions.id"), nullable=True)  # state, if any
     area = db.Column(db.String, nullable=False)                  # e.g. "Bishop", "Rocklands"
     crag = db.Column(db.String, default="")                      # e.g. "Buttermilks" (optional)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Tiny reference rows, always wanted with the location: join them in
+    country = db.relationship(Country, lazy="joined", innerjoin=True)
+    subdivision = db.relationship(Subdivision, lazy="joined")
     projects = db.relationship("Project", backref="location", lazy=True)
 
+    @property
+    def country_code(self):
+        return self.country.code
+
+    @property
+    def country_name(self):
+        return self.country.name
+
+    @property
+    def state_code(self):
+        return self.subdivision.code if self.subdivision else ""
+
+    @property
+    def state_name(self):
+        return self.subdivision.name if self.subdivision else ""
+
     @property
     def state_short(self):
-        """Concise state label: 'CO' for US-CO, first word for long intl names."""
-        if not self.state_name:
-            return ""
-        # US states – use the 2-letter abbreviation from state_code (e.g. US-CO → CO)
-        if self.country_code == "US" and self.state_code and "-" in self.state_code:
-            suffix = self.state_code.split("-", 1)[1]
-            if suffix.isalpha() and len(suffix) <= 3:
-                return suffix.upper()
-        # International: first word of the state name (e.g. "Guangxi Zhuangzu Zizhiqu" → "Guangxi")
-        first = self.state_name.split()[0]
-        if first != self.state_name:
-            return first
-        return self.state_name
+        return self.subdivision.short_name if self.subdivision else ""
 
     def to_dict(self):
         return {
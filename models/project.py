@@ -1,9 +1,22 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from models import db, PROJECT_STATUS, PROJECT_TYPE
+from models.session import Session, STYLE_FLASH, STYLE_SEND
+from models.user import User
+
+# Projects with no real session in this long drop from Projecting to On Hold
+ON_HOLD_AFTER = timedelta(days=180)
 
 
 class Project(db.Model):
     __tablename__ = "projects"
+    __table_args__ = (
+        # list_projects: WHERE user_id = ? ORDER BY created_at DESC; also every per-user join
+        db.Index("ix_projects_user_id_created_at", "user_id", "created_at"),
+        # delete_location's reference count and location -> project joins
+        db.Index("ix_projects_location_id", "location_id"),
+        # sweep-on-hold: WHERE status = 1 AND last_session_date < ?
+        db.Index("ix_projects_status_last_session_date", "status", "last_session_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -17,25 +30,123 @@ class Project(db.Model):
     notes = db.Column(db.Text, default="")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Activity summary, maintained by add/remove_session_stats on every session write
+    last_session_date = db.Column(db.Date, nullable=True)        # latest non-planned session
+    next_session_date = db.Column(db.Date, nullable=True)        # earliest planned session
+    first_send_date = db.Column(db.Date, nullable=True)          # earliest flash/send
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    send_count = db.Column(db.Integer, nullable=False, default=0)
+
     sessions = db.relationship(
         "Session", backref="project", cascade="all, delete-orphan", lazy=True
     )
 
-    @property
-    def last_session(self):
-        """Return the most recent non-planned session by date, or None."""
-        real = [s for s in self.sessions if not s.planned]
-        if not real:
-            return None
-        return max(real, key=lambda s: s.date)
-
-    @property
-    def next_session(self):
-        """Return the earliest planned session, or None."""
-        planned = [s for s in self.sessions if s.planned]
-        if not planned:
-            return None
-        return min(planned, key=lambda s: s.date)
+    @classmethod
+    def derived_status(cls, today=None):
+        """SQL expression for the status implied by the activity summary."""
+        cutoff = (today or date.today()) - ON_HOLD_AFTER
+        return db.case(
+            (cls.send_count > 0, 3),                  # Sent
+            (cls.attempt_count == 0, 0),              # To Try
+            (cls.last_session_date < cutoff, 2),      # On Hold
+            else_=1,                                  # Projecting
+        )
+
+    @classmethod
+    def sweep_on_hold(cls, today=None):
+        """Move every stale Projecting project to On Hold; return the row count."""
+        cutoff = (today or date.today()) - ON_HOLD_AFTER
+        stale = (cls.status == 1, cls.last_session_date < cutoff)
+        User.bump_data_version_where(User.id.in_(db.select(cls.user_id).where(*stale)))
+        result = db.session.execute(
+            db.update(cls)
+            .where(*stale)
+            .values(status=2)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @classmethod
+    def refresh_summaries(cls, project_ids):
+        """Recompute the activity summary and status of many projects set-wise.
+
+        Two UPDATEs however many projects and sessions are involved; used
+        after bulk writes that bypass add/remove_session_stats.
+        """
+        real = Session.planned == False  # noqa: E712
+        sends = Session.style.in_([STYLE_FLASH, STYLE_SEND])
+
+        def per_project(agg, *criteria):
+            return (
+                db.select(agg)
+                .where(Session.project_id == cls.id, *criteria)
+                .scalar_subquery()
+            )
+
+        selected = db.update(cls).where(cls.id.in_(project_ids))
+        db.session.execute(
+            selected.values(
+                last_session_date=per_project(db.func.max(Session.date), real),
+                next_session_date=per_project(db.func.min(Session.date), ~real),
+                first_send_date=per_project(db.func.min(Session.date), real, sends),
+                attempt_count=per_project(db.func.count(Session.id), real, ~sends),
+                send_count=per_project(db.func.count(Session.id), real, sends),
+            ).execution_options(synchronize_session=False)
+        )
+        # Separate statement: status must see the summary values just written
+        db.session.execute(
+            selected.values(status=cls.derived_status())
+            .execution_options(synchronize_session=False)
+        )
+
+    def add_session_stats(self, date, style, planned):
+        """Fold a newly written session into the summary fields."""
+        if planned:
+            if self.next_session_date is None or date < self.next_session_date:
+                self.next_session_date = date
+            return
+        if style in (STYLE_FLASH, STYLE_SEND):
+            self.send_count = (self.send_count or 0) + 1
+            if self.first_send_date is None or date < self.first_send_date:
+                self.first_send_date = date
+        else:
+            self.attempt_count = (self.attempt_count or 0) + 1
+        if self.last_session_date is None or date > self.last_session_date:
+            self.last_session_date = date
+
+    def remove_session_stats(self, date, style, planned):
+        """Undo add_session_stats for a session that was deleted or changed.
+
+        Call this after the change is applied to the session: if the removed
+        date was the stored extreme, it is re-read from the sessions table.
+        """
+        if planned:
+            if date == self.next_session_date:
+                self.next_session_date = self._session_date(
+                    db.func.min, Session.planned == True  # noqa: E712
+                )
+            return
+        if style in (STYLE_FLASH, STYLE_SEND):
+            self.send_count = max((self.send_count or 0) - 1, 0)
+            if date == self.first_send_date:
+                self.first_send_date = self._session_date(
+                    db.func.min,
+                    Session.planned == False,  # noqa: E712
+                    Session.style.in_([STYLE_FLASH, STYLE_SEND]),
+                )
+        else:
+            self.attempt_count = max((self.attempt_count or 0) - 1, 0)
+        if date == self.last_session_date:
+            self.last_session_date = self._session_date(
+                db.func.max, Session.planned == False  # noqa: E712
+            )
+
+    def _session_date(self, agg, *criteria):
+        return (
+            db.session.query(agg(Session.date))
+            .filter(Session.project_id == self.id, *criteria)
+            .scalar()
+        )
 
     def to_dict(self):
         return {
@@ -51,6 +162,11 @@ class Project(db.Model):
             "location_id": self.location_id,
             "location": self.location.to_dict() if self.location else None,
             "notes": self.notes,
+            "last_session_date": self.last_session_date.isoformat() if self.last_session_date else None,
+            "next_session_date": self.next_session_date.isoformat() if self.next_session_date else None,
+            "first_send_date": self.first_send_date.isoformat() if self.first_send_date else None,
+            "attempt_count": self.attempt_count or 0,
+            "send_count": self.send_count or 0,
             "sessions": [s.to_dict() for s in sorted(self.sessions, key=lambda s: (s.planned, s.date), reverse=True)],
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
@@ -0,0 +1,69 @@
+from datetime import date
+from models import db
+from models.project import Project
+from models.session import Session
+
+
+class SessionRollup(db.Model):
+    """Non-planned session counts per (user, year, type, grade, style).
+
+    Session and project writes queue a "rollups" job (see jobs.py) that
+    recomputes the (user, year) rows they touched after the response is
+    sent; ``flask rebuild-rollups`` recomputes it from scratch.
+    """
+    __tablename__ = "session_rollups"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.Integer, primary_key=True)               # project type, see PROJECT_TYPE
+    grade = db.Column(db.String, primary_key=True)               # project grade, e.g. "V5", "5.12a"
+    style = db.Column(db.Integer, primary_key=True)              # session style, see SESSION_STYLES
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def years_of(cls, project_id):
+        """Years in which ``project_id`` has non-planned sessions."""
+        return db.session.scalars(
+            db.select(_year(Session.date))
+            .where(Session.project_id == project_id, Session.planned == False)  # noqa: E712
+            .distinct()
+        ).all()
+
+    @classmethod
+    def rebuild(cls, user_id=None, year=None):
+        """Recompute rollups from the sessions table for one user, or everyone.
+
+        With ``year``, only that year's rows are replaced.
+        """
+        delete = db.delete(cls)
+        grouped = (
+            db.select(
+                Project.user_id,
+                _year(Session.date),
+                Project.type,
+                Project.grade,
+                Session.style,
+                db.func.count(Session.id),
+            )
+            .join(Project, Session.project_id == Project.id)
+            .where(Session.planned == False)  # noqa: E712
+            .group_by(Project.user_id, _year(Session.date), Project.type, Project.grade, Session.style)
+        )
+        if user_id is not None:
+            delete = delete.where(cls.user_id == user_id)
+            grouped = grouped.where(Project.user_id == user_id)
+        if year is not None:
+            delete = delete.where(cls.year == year)
+            # A date range, so the (project_id, planned, date) index applies
+            grouped = grouped.where(Session.date >= date(year, 1, 1), Session.date < date(year + 1, 1, 1))
+        db.session.execute(delete)
+        result = db.session.execute(
+            db.insert(cls).from_select(
+                ["user_id", "year", "type", "grade", "style", "count"], grouped
+            )
+        )
+        return result.rowcount
+
+
+def _year(col):
+    return db.cast(db.func.extract("year", col), db.Integer)
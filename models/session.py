@@ -12,6 +12,11 @@ SESSION_STYLES = {STYLE_ATTEMPT: "Attempt", STYLE_FLASH: "Flash", STYLE_SEND: "S
 
 class Session(db.Model):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Stream/ascents, session-years, the list_projects date filters and the
+        # per-project MIN/MAX summary lookups all probe (project_id, planned, date)
+        db.Index("ix_sessions_project_id_planned_date", "project_id", "planned", "date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False)
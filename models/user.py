@@ -27,6 +27,7 @@ class User(db.Model, UserMixin):
     height_cm = db.Column(db.Float, nullable=True)          # height in cm
     reach_cm = db.Column(db.Float, nullable=True)           # reach / ape index in cm
     avatar_style = db.Column(db.String(30), nullable=False, default="adventurer")
+    data_version = db.Column(db.Integer, nullable=False, default=0)   # bumped by every write; drives ETags
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     projects = db.relationship(
@@ -39,6 +40,20 @@ class User(db.Model, UserMixin):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def bump_data_version(self):
+        """Mark this user's data as changed so cached GETs revalidate."""
+        self.data_version = User.data_version + 1
+
+    @classmethod
+    def bump_data_version_where(cls, *criteria):
+        """Bump the data version of every user matching ``criteria``."""
+        db.session.execute(
+            db.update(cls)
+            .where(*criteria)
+            .values(data_version=cls.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
     @property
     def avatar_url(self):
         """DiceBear avatar URL seeded by username."""
@@ -1,11 +1,40 @@
-from flask import jsonify
+import gzip
+import os
+from datetime import date
+from flask import Response, current_app, g, jsonify, request, stream_with_context
 from flask_login import current_user
+from cache import get_user_by_username
 from models import db, User
 
+# Rows serialized per chunk written to the socket by _stream_json_array
+STREAM_CHUNK_ROWS = 200
+
+# Part of every data ETag so a deploy that changes response shapes
+# invalidates what clients hold (Railway sets the commit SHA).
+DEPLOY_ID = os.environ.get("RAILWAY_GIT_COMMIT_SHA", "dev")[:12]
+
+# Dynamic responses of these types are gzipped on the fly above this size
+# (the bootstrap payload makes index.html as big as any API response)
+COMPRESS_MIMETYPES = {"application/json", "text/html"}
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+# /api/<username>/... endpoints whose body also depends on who is asking
+# (or on global data), so the per-user data ETag can't validate them.
+VIEWER_DEPENDENT_ENDPOINTS = {"pages.bootstrap"}
+
+# private: responses may depend on the session cookie, so shared caches must
+# not store them and replay them to other clients
+DATA_CACHE_CONTROL = "private, no-cache"
+
+# /api/<username>/... GETs only the owner may read. The data ETag is public,
+# so answering 304 to it would skip their _require_owner check.
+OWNER_ONLY_ENDPOINTS = {"logbook.export_logbook"}
+
 
 def _get_user_or_404(username):
     """Look up a user by username or return (None, error_response)."""
-    user = User.query.filter_by(username=username).first()
+    user = get_user_by_username(username)
     if not user:
         return None, (jsonify({"error": "User not found"}), 404)
     return user, None
@@ -15,12 +44,108 @@ def _require_owner(username):
     """Return (user, None) if current_user owns this profile, else (None, error)."""
     if not current_user.is_authenticated:
         return None, (jsonify({"error": "Login required"}), 401)
-    user, err = _get_user_or_404(username)
+    if current_user.username == username:
+        # Already loaded by Flask-Login; no need to look the owner up again
+        return current_user._get_current_object(), None
+    _, err = _get_user_or_404(username)
     if err:
         return None, err
-    if current_user.id != user.id:
-        return None, (jsonify({"error": "Forbidden"}), 403)
-    return user, None
+    return None, (jsonify({"error": "Forbidden"}), 403)
+
+
+def _stream_json_array(rows, serialize):
+    """Stream *rows* as a JSON array, serializing them chunk by chunk.
+
+    Only one chunk of encoded rows is held at a time, so memory stays flat
+    however many rows the iterable yields; pair it with ``yield_per`` so the
+    rows themselves also arrive from the database in batches.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield "["
+        chunk = []
+        sep = ""
+        for row in rows:
+            chunk.append(sep + dumps(serialize(row)))
+            sep = ","
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+def _conditional_get():
+    """Answer a matching If-None-Match on GET /api/<username>/... with 304.
+
+    The ETag is derived from the user's data_version, which every write to
+    their data bumps, so this costs one indexed lookup and no other query.
+    The day is part of it too, since ytd filters move with the calendar.
+    """
+    if request.method != "GET" or not request.path.startswith("/api/"):
+        return None
+    username = (request.view_args or {}).get("username")
+    if (
+        username is None
+        or request.endpoint in VIEWER_DEPENDENT_ENDPOINTS
+        or request.endpoint in OWNER_ONLY_ENDPOINTS
+    ):
+        return None
+    row = (
+        db.session.query(User.id, User.data_version)
+        .filter(User.username == username)
+        .first()
+    )
+    if row is None:
+        return None
+    g.data_etag = f"{row.id}-{row.data_version}-{date.today().isoformat()}-{DEPLOY_ID}"
+    if request.if_none_match.contains_weak(g.data_etag):
+        response = Response(status=304)
+        response.set_etag(g.data_etag, weak=True)
+        response.headers["Cache-Control"] = DATA_CACHE_CONTROL
+        return response
+    return None
+
+
+def _add_data_etag(response):
+    """Attach the ETag computed by _conditional_get to successful responses."""
+    etag = g.pop("data_etag", None)
+    if etag and response.status_code == 200:
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = DATA_CACHE_CONTROL
+    return response
+
+
+def _compress_response(response):
+    """Gzip sizeable JSON/HTML bodies for clients that accept it.
+
+    Streamed and file responses are left alone: streams are sent as they
+    are produced, and static assets are served pre-compressed.
+    """
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or response.is_streamed
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not request.accept_encodings["gzip"]
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The gzipped bytes differ from the identity ones a strong tag vouches for
+        response.set_etag(etag, weak=True)
+    response.vary.add("Accept-Encoding")
+    return response
 
 
 def register_blueprints(app):
@@ -31,6 +156,9 @@ def register_blueprints(app):
     from routes.sessions import bp as sessions_bp
     from routes.locations import bp as locations_bp
     from routes.ascents import bp as ascents_bp
+    from routes.logbook import bp as logbook_bp
+    from routes.search import bp as search_bp
+    from routes.assets import bp as assets_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(pages_bp)
@@ -38,3 +166,10 @@ def register_blueprints(app):
     app.register_blueprint(sessions_bp)
     app.register_blueprint(locations_bp)
     app.register_blueprint(ascents_bp)
+    app.register_blueprint(logbook_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(assets_bp)
+
+    app.before_request(_conditional_get)
+    app.after_request(_add_data_etag)
+    app.after_request(_compress_response)
@@ -1,23 +1,22 @@
+import base64
+import re
 from datetime import date
 from flask import Blueprint, request, jsonify
-from models import db, Project, Session
-from models.session import STYLE_FLASH, STYLE_SEND
-from routes import _get_user_or_404
+from models import db, Location, Project, Session, SessionRollup, Subdivision, PROJECT_TYPE
+from models.session import SESSION_STYLES, STYLE_FLASH, STYLE_SEND
+from routes import _get_user_or_404, _stream_json_array
 
 bp = Blueprint("ascents", __name__)
 
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500          # rows fetched per round trip in ?stream=1 mode
 
-def _build_session_query(user, sends_only=False):
-    """Build a base query for non-planned sessions joined with project + location."""
-    q = (
-        db.session.query(Session, Project)
-        .join(Project, Session.project_id == Project.id)
-        .filter(Project.user_id == user.id, Session.planned == False)  # noqa: E712
-    )
-    if sends_only:
-        q = q.filter(Session.style.in_([STYLE_FLASH, STYLE_SEND]))
+ROUTE_GRADE_RE = re.compile(r"^5\.(\d+)([a-d])$", re.IGNORECASE)
+ROUTE_BUCKET_SUFFIX = {"a": "-", "b": "", "c": "", "d": "+"}
 
-    # Year / YTD filtering
+
+def _apply_year_filter(q):
+    """Restrict a session query to ?year=YYYY or ?ytd=1, if given."""
     year = request.args.get("year")
     ytd = request.args.get("ytd")
     if ytd == "1":
@@ -34,27 +33,119 @@ def _build_session_query(user, sends_only=False):
             )
         except ValueError:
             pass
+    return q
+
+
+# Everything _session_to_dict needs, selected as plain columns: no ORM
+# entities, identity map or per-row lazy load of project.location
+SESSION_COLUMNS = (
+    Session.id,
+    Session.date,
+    Session.style,
+    Session.notes,
+    Project.name.label("project_name"),
+    Project.grade,
+    Project.type,
+    Project.location_id,
+    Location.crag,
+    db.func.coalesce(Subdivision.name, "").label("state_name"),
+    db.func.coalesce(Subdivision.short_name, "").label("state_short"),
+)
+
+
+def _build_session_query(user, sends_only=False):
+    """Build a column select of non-planned sessions joined with project + location."""
+    q = (
+        db.select(*SESSION_COLUMNS)
+        .join(Project, Session.project_id == Project.id)
+        .outerjoin(Location, Project.location_id == Location.id)
+        .outerjoin(Subdivision, Location.subdivision_id == Subdivision.id)
+        .where(Project.user_id == user.id, Session.planned == False)  # noqa: E712
+    )
+    if sends_only:
+        q = q.where(Session.style.in_([STYLE_FLASH, STYLE_SEND]))
+    q = _apply_year_filter(q)
+    return q.order_by(Session.date.desc(), Session.id.desc())
+
+
+def _execute(q, **options):
+    """Run a column select on the session's Connection, skipping the ORM result layer."""
+    return db.session.connection().execute(q.execution_options(**options))
+
+
+def _route_bucket(grade):
+    """Map a letter grade like '5.11a' to a Mountain Project bucket like '5.11-'."""
+    m = ROUTE_GRADE_RE.match(grade or "")
+    if not m:
+        return None
+    num, letter = m.group(1), m.group(2).lower()
+    return f"5.{num}{ROUTE_BUCKET_SUFFIX[letter]}"
+
 
-    return q.order_by(Session.date.desc())
+def _encode_cursor(row):
+    """Opaque keyset cursor pointing just past *row* in (date, id) order."""
+    raw = f"{row.date.isoformat()}:{row.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-def _session_to_dict(session, project):
-    """Serialize a session + project pair for API response."""
-    loc = project.location
+def _decode_cursor(cursor):
+    """Inverse of _encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    day, _, session_id = raw.partition(":")
+    return date.fromisoformat(day), int(session_id)
+
+
+def _session_list_response(q):
+    """Serialize a session query, keyset-paginated when ?limit is given.
+
+    Without ``limit`` the full list is returned as before. With it, the
+    response is ``{"items": [...], "next": cursor}``; pass ``next`` back
+    as ``?cursor=`` to continue, ``next`` is null on the last page.
+    ``?stream=1`` returns the full list as a chunked response instead,
+    reading rows from the database in batches.
+    """
+    if request.args.get("stream") == "1":
+        return _stream_json_array(
+            _execute(q, yield_per=STREAM_BATCH_SIZE), _session_to_dict
+        )
+    limit = request.args.get("limit", type=int)
+    if limit is None:
+        return jsonify([_session_to_dict(row) for row in _execute(q)])
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            after_date, after_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        q = q.filter(db.tuple_(Session.date, Session.id) < (after_date, after_id))
+    rows = _execute(q.limit(limit + 1)).all()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return jsonify({
+        "items": [_session_to_dict(row) for row in rows[:limit]],
+        "next": next_cursor,
+    })
+
+
+def _session_to_dict(row):
+    """Serialize a SESSION_COLUMNS row for API response."""
     return {
-        "date": session.date.isoformat() if session.date else None,
-        "style": session.style,
-        "style_label": {0: "Attempt", 1: "Flash", 2: "Send"}.get(session.style, "Attempt"),
-        "project_name": project.name,
-        "grade": project.grade,
-        "type": project.type,
-        "type_label": {0: "Sport", 1: "Boulder", 2: "Trad"}.get(project.type, "Unknown"),
+        "date": row.date.isoformat() if row.date else None,
+        "style": row.style,
+        "style_label": SESSION_STYLES.get(row.style, "Attempt"),
+        "project_name": row.project_name,
+        "grade": row.grade,
+        "type": row.type,
+        "type_label": PROJECT_TYPE.get(row.type, "Unknown"),
         "location": {
-            "crag": loc.crag if loc else "",
-            "state_name": loc.state_name if loc else "",
-            "state_short": loc.state_short if loc else "",
-        } if loc else None,
-        "notes": session.notes or "",
+            "crag": row.crag,
+            "state_name": row.state_name,
+            "state_short": row.state_short,
+        } if row.location_id is not None else None,
+        "notes": row.notes or "",
     }
 
 
@@ -64,8 +155,7 @@ def get_ascents(username):
     user, err = _get_user_or_404(username)
     if err:
         return err
-    rows = _build_session_query(user, sends_only=True).all()
-    return jsonify([_session_to_dict(s, p) for s, p in rows])
+    return _session_list_response(_build_session_query(user, sends_only=True))
 
 
 @bp.route("/api/<username>/stream", methods=["GET"])
@@ -74,5 +164,57 @@ def get_stream(username):
     user, err = _get_user_or_404(username)
     if err:
         return err
-    rows = _build_session_query(user, sends_only=False).all()
-    return jsonify([_session_to_dict(s, p) for s, p in rows])
+    return _session_list_response(_build_session_query(user, sends_only=False))
+
+
+@bp.route("/api/<username>/ascents/pyramid", methods=["GET"])
+def get_pyramid(username):
+    """Return send counts grouped by grade, type and style, filtered by year.
+
+    ``?buckets=mp`` folds rope grades into Mountain Project-style buckets
+    (5.11a -> 5.11-, 5.11b/c -> 5.11, 5.11d -> 5.11+).
+    """
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    if request.args.get("ytd") == "1":
+        # Needs day precision, so count raw sessions rather than yearly rollups
+        q = (
+            db.session.query(Project.grade, Project.type, Session.style, db.func.count(Session.id))
+            .join(Project, Session.project_id == Project.id)
+            .filter(
+                Project.user_id == user.id,
+                Session.planned == False,  # noqa: E712
+                Session.style.in_([STYLE_FLASH, STYLE_SEND]),
+            )
+            .group_by(Project.grade, Project.type, Session.style)
+        )
+        q = _apply_year_filter(q)
+    else:
+        q = (
+            db.session.query(
+                SessionRollup.grade,
+                SessionRollup.type,
+                SessionRollup.style,
+                db.func.sum(SessionRollup.count),
+            )
+            .filter(
+                SessionRollup.user_id == user.id,
+                SessionRollup.style.in_([STYLE_FLASH, STYLE_SEND]),
+            )
+            .group_by(SessionRollup.grade, SessionRollup.type, SessionRollup.style)
+        )
+        year = request.args.get("year", type=int)
+        if year:
+            q = q.filter(SessionRollup.year == year)
+    mp_buckets = request.args.get("buckets") == "mp"
+    counts = {}
+    for grade, climb_type, style, n in q.all():
+        if mp_buckets and climb_type in (0, 2):
+            grade = _route_bucket(grade) or grade
+        key = (grade, climb_type, style)
+        counts[key] = counts.get(key, 0) + int(n)
+    return jsonify([
+        {"grade": grade, "type": climb_type, "style": style, "count": n}
+        for (grade, climb_type, style), n in sorted(counts.items())
+    ])
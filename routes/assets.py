@@ -0,0 +1,30 @@
+import mimetypes
+import os
+from flask import Blueprint, abort, request, send_from_directory
+from assets import DIST_DIR
+
+bp = Blueprint("assets", __name__)
+
+# Built files are content-hashed, so any given URL never changes
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Preferred first; each needs a pre-built variant next to the file
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+@bp.route("/assets/<path:filename>")
+def asset(filename):
+    """Serve a built asset, pre-compressed when the client accepts it."""
+    if filename.endswith((".br", ".gz")) or filename == "manifest.json":
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding, served = None, filename
+    for name, suffix in ENCODINGS:
+        if request.accept_encodings[name] and os.path.isfile(os.path.join(DIST_DIR, filename + suffix)):
+            encoding, served = name, filename + suffix
+            break
+    response = send_from_directory(DIST_DIR, served, mimetype=mimetype, max_age=31536000)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = ASSET_CACHE_CONTROL
+    return response
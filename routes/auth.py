@@ -65,5 +65,6 @@ def update_profile():
         current_user.height_cm = float(data["height_cm"]) if data["height_cm"] is not None else None
     if "reach_cm" in data:
         current_user.reach_cm = float(data["reach_cm"]) if data["reach_cm"] is not None else None
+    current_user.bump_data_version()
     db.session.commit()
     return jsonify(current_user.to_dict())
@@ -1,30 +1,38 @@
-import pycountry
-from flask import Blueprint, request, jsonify
-from models import db, Location
+from flask import Blueprint, Response, request, jsonify
+import catalog
+import search
+from models import db, Country, Location, Project, Subdivision, User
+from routes import _get_user_or_404
 
 bp = Blueprint("locations", __name__)
 
+# ISO data only changes with a pycountry upgrade, which also changes the ETag
+CATALOG_CACHE_CONTROL = "public, max-age=604800"
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
 
 # ---------------------------------------------------------------------------
 # Countries & Subdivisions (from pycountry / ISO 3166)
 # ---------------------------------------------------------------------------
 
+def _catalog_response(payload):
+    body, etag = payload
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+    return response.make_conditional(request)
+
+
 @bp.route("/api/countries", methods=["GET"])
 def list_countries():
-    countries = sorted(pycountry.countries, key=lambda c: c.name)
-    return jsonify([{"code": c.alpha_2, "name": c.name} for c in countries])
+    return _catalog_response(catalog.countries_payload())
 
 
 @bp.route("/api/countries/<country_code>/subdivisions", methods=["GET"])
 def list_subdivisions(country_code):
-    subs = pycountry.subdivisions.get(country_code=country_code.upper())
-    if subs is None:
-        return jsonify([])
-    result = sorted(
-        [{"code": s.code, "name": s.name, "type": s.type} for s in subs],
-        key=lambda s: s["name"],
-    )
-    return jsonify(result)
+    return _catalog_response(catalog.subdivisions_payload(country_code))
 
 
 # ---------------------------------------------------------------------------
@@ -33,30 +41,78 @@ def list_subdivisions(country_code):
 
 @bp.route("/api/locations", methods=["GET"])
 def list_locations():
-    locations = Location.query.order_by(
-        Location.country_name, Location.state_name, Location.area
-    ).all()
+    return jsonify(location_list())
+
+
+def _in_display_order(query):
+    """Order a Location query by country, state and area names.
+
+    Joins the reference tables once, both for the ORDER BY and to fill
+    country/subdivision, instead of adding the eager loads' own joins.
+    """
+    return (
+        query.join(Location.country)
+        .outerjoin(Location.subdivision)
+        .options(db.contains_eager(Location.country), db.contains_eager(Location.subdivision))
+        .order_by(Country.name, db.func.coalesce(Subdivision.name, ""), Location.area)
+    )
+
+
+def location_list():
+    locations = _in_display_order(Location.query).all()
+    return [{**l.to_dict(), "display_name": l.display_name()} for l in locations]
+
+
+@bp.route("/api/locations/search", methods=["GET"])
+def search_locations():
+    """Typeahead over every location's area, crag and state, best match first."""
+    limit = request.args.get("limit", DEFAULT_SEARCH_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    locations = search.find_locations(request.args.get("q", ""), limit)
     return jsonify([{**l.to_dict(), "display_name": l.display_name()} for l in locations])
 
 
+@bp.route("/api/<username>/locations", methods=["GET"])
+def list_user_locations(username):
+    """Locations referenced by this user's projects."""
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    return jsonify(user_location_list(user))
+
+
+def user_location_list(user):
+    # Driven by the user's projects (ix_projects_user_id_created_at), not a
+    # scan of the shared table
+    used = db.select(Project.location_id).where(Project.user_id == user.id)
+    locations = _in_display_order(Location.query.filter(Location.id.in_(used))).all()
+    return [{**l.to_dict(), "display_name": l.display_name()} for l in locations]
+
+
+def _region_ids(country_code, state_code):
+    """Return (country_id, subdivision_id, error) for submitted codes."""
+    country_ids = Country.ids_for([country_code])
+    if country_code not in country_ids:
+        return None, None, "Invalid country code"
+    if not state_code:
+        return country_ids[country_code], None, None
+    sub = catalog.subdivision(state_code)
+    if not sub:
+        return None, None, "Invalid subdivision code"
+    return country_ids[country_code], Subdivision.ids_for([sub["code"]])[sub["code"]], None
+
+
 @bp.route("/api/locations", methods=["POST"])
 def create_location():
     data = request.get_json(force=True)
-    country = pycountry.countries.get(alpha_2=data["country_code"])
-    if not country:
-        return jsonify({"error": "Invalid country code"}), 400
-    state_name = ""
-    state_code = data.get("state_code", "")
-    if state_code:
-        sub = pycountry.subdivisions.get(code=state_code)
-        if not sub:
-            return jsonify({"error": "Invalid subdivision code"}), 400
-        state_name = sub.name
+    country_id, subdivision_id, error = _region_ids(
+        (data["country_code"] or "").upper(), data.get("state_code", "")
+    )
+    if error:
+        return jsonify({"error": error}), 400
     loc = Location(
-        country_code=country.alpha_2,
-        country_name=country.name,
-        state_code=state_code,
-        state_name=state_name,
+        country_id=country_id,
+        subdivision_id=subdivision_id,
         area=data["area"],
         crag=data.get("crag", ""),
     )
@@ -70,27 +126,22 @@ def update_location(loc_id):
     loc = Location.query.get_or_404(loc_id)
     data = request.get_json(force=True)
 
-    country = pycountry.countries.get(alpha_2=data.get("country_code", loc.country_code))
-    if not country:
-        return jsonify({"error": "Invalid country code"}), 400
-
-    state_name = loc.state_name
-    state_code = data.get("state_code", loc.state_code)
-    if state_code and state_code != loc.state_code:
-        sub = pycountry.subdivisions.get(code=state_code)
-        if not sub:
-            return jsonify({"error": "Invalid subdivision code"}), 400
-        state_name = sub.name
-    elif not state_code:
-        state_name = ""
-
-    loc.country_code = country.alpha_2
-    loc.country_name = country.name
-    loc.state_code = state_code
-    loc.state_name = state_name
+    country_id, subdivision_id, error = _region_ids(
+        (data.get("country_code", loc.country_code) or "").upper(),
+        data.get("state_code", loc.state_code),
+    )
+    if error:
+        return jsonify({"error": error}), 400
+    loc.country_id = country_id
+    loc.subdivision_id = subdivision_id
     loc.area = data.get("area", loc.area)
     loc.crag = data.get("crag", loc.crag)
 
+    # Locations are embedded in project payloads, so every user referencing
+    # this one has to revalidate.
+    User.bump_data_version_where(
+        User.id.in_(db.select(Project.user_id).where(Project.location_id == loc.id))
+    )
     db.session.commit()
     return jsonify({**loc.to_dict(), "display_name": loc.display_name()})
 
@@ -99,7 +150,6 @@ def update_location(loc_id):
 def delete_location(loc_id):
     loc = Location.query.get_or_404(loc_id)
     # Check if any projects reference this location
-    from models import Project
     count = Project.query.filter_by(location_id=loc.id).count()
     if count > 0:
         return jsonify({"error": f"Cannot delete: {count} project(s) use this location"}), 409
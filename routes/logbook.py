@@ -0,0 +1,519 @@
+import csv
+import io
+import time
+from datetime import date
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+import catalog
+import jobs
+from models import db, Country, Location, Project, Session, Subdivision
+from models.session import STYLE_ATTEMPT, STYLE_FLASH, STYLE_SEND
+from routes import STREAM_CHUNK_ROWS, _require_owner
+from routes.projects import validate_grade
+
+bp = Blueprint("logbook", __name__)
+
+IMPORT_BATCH_SIZE = 1000        # sessions per INSERT round trip
+MAX_IMPORT_ROWS = 50000
+MAX_REPORTED_ERRORS = 500
+EXPORT_BATCH_SIZE = 1000        # rows fetched per server-side cursor round trip
+
+# kexian's own CSV logbook format: one row per session (a project with no
+# sessions gets one row with an empty date). "notes" are session notes.
+LOGBOOK_COLUMNS = [
+    "date", "style", "planned", "notes",
+    "name", "grade", "type", "pitches", "length", "project_notes",
+    "country_code", "state_code", "area", "crag",
+]
+
+TYPE_NAMES = {"sport": 0, "boulder": 1, "trad": 2}
+STYLE_NAMES = {
+    "attempt": STYLE_ATTEMPT,
+    "flash": STYLE_FLASH,
+    "onsight": STYLE_FLASH,
+    "send": STYLE_SEND,
+    "redpoint": STYLE_SEND,
+    "pinkpoint": STYLE_SEND,
+}
+# Names written by the export; all of them read back through the maps above
+TYPE_EXPORT_NAMES = {0: "sport", 1: "boulder", 2: "trad"}
+STYLE_EXPORT_NAMES = {STYLE_ATTEMPT: "attempt", STYLE_FLASH: "flash", STYLE_SEND: "send"}
+
+EXPORT_MIMETYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _read_rows():
+    """Return (raw_rows, None) from the request, or (None, error_response).
+
+    Accepts a CSV upload (multipart ``file`` or a text/csv body) in either
+    kexian's format or a Mountain Project tick export, a JSON list of rows,
+    or JSON ``{"projects": [{..., "location": {...}, "sessions": [...]}]}``.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        return _csv_rows(upload.read().decode("utf-8-sig")), None
+    if request.mimetype == "text/csv":
+        return _csv_rows(request.get_data(as_text=True)), None
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("projects"), list):
+        return list(_flatten_projects(data["projects"])), None
+    if isinstance(data, list):
+        return data, None
+    return None, (jsonify({"error": "Expected a CSV file or a JSON logbook"}), 400)
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    headers = set(reader.fieldnames or [])
+    if {"Route", "Rating"} <= headers:
+        return [_from_mountain_project(row) for row in reader]
+    return [{(k or "").strip().lower(): v for k, v in row.items()} for row in reader]
+
+
+def _flatten_projects(projects):
+    for p in projects:
+        base = {
+            "name": p.get("name"),
+            "grade": p.get("grade"),
+            "type": p.get("type"),
+            "pitches": p.get("pitches"),
+            "length": p.get("length"),
+            "project_notes": p.get("notes"),
+            "location": p.get("location"),
+        }
+        sessions = p.get("sessions") or []
+        if not sessions:
+            yield base
+        for s in sessions:
+            yield {
+                **base,
+                "date": s.get("date"),
+                "style": s.get("style"),
+                "planned": s.get("planned"),
+                "notes": s.get("notes"),
+            }
+
+
+def _from_mountain_project(row):
+    """Map one Mountain Project tick-export row onto kexian's row format."""
+    route_type = (row.get("Route Type") or "").lower()
+    if "boulder" in route_type:
+        climb_type = 1
+    elif route_type.startswith("trad"):
+        climb_type = 2
+    elif "sport" in route_type:
+        climb_type = 0
+    else:
+        climb_type = route_type     # e.g. "TR", "Ice": reported as an unknown type
+    style = (row.get("Lead Style") or row.get("Style") or "").strip().lower()
+    return {
+        "date": row.get("Date"),
+        "name": row.get("Route"),
+        "grade": (row.get("Rating") or "").split(" ")[0],
+        "type": climb_type,
+        "style": STYLE_NAMES.get(style, STYLE_ATTEMPT),
+        "notes": row.get("Notes"),
+        "pitches": row.get("Pitches"),
+        "length": row.get("Length"),
+        "location": _mountain_project_location(row.get("Location") or ""),
+    }
+
+
+def _mountain_project_location(path):
+    """'California > Bishop Area > Buttermilks' -> kexian location fields.
+
+    US paths start with the state; international ones look like
+    'International > Europe > Spain > Catalonia > Siurana > ...'.
+    """
+    parts = [p.strip() for p in path.split(">") if p.strip()]
+    if not parts:
+        return None
+    if parts[0] == "International" and len(parts) >= 3:
+        country_code = catalog.country_code_by_name(parts[2]) or ""
+        parts = parts[3:]
+    else:
+        country_code = "US"
+    state_code = ""
+    if parts:
+        sub = catalog.subdivision_by_name(country_code, parts[0])
+        if sub:
+            state_code = sub["code"]
+            parts = parts[1:]
+    if not parts:
+        return {"country_code": country_code, "state_code": state_code, "area": "", "crag": ""}
+    return {
+        "country_code": country_code,
+        "state_code": state_code,
+        "area": parts[0],
+        "crag": parts[-1] if len(parts) > 1 else "",
+    }
+
+
+def _parse_row(raw):
+    """Validate one raw row into a normalized dict; raises ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        raise ValueError("Name is required.")
+    climb_type = _parse_choice(raw.get("type"), TYPE_NAMES, "type", default=1)
+    grade = str(raw.get("grade") or "").strip()
+    err_msg = validate_grade(grade, climb_type)
+    if err_msg:
+        raise ValueError(err_msg)
+    day = raw.get("date")
+    pitches = raw.get("pitches")
+    return {
+        "name": name,
+        "grade": grade,
+        "type": climb_type,
+        "pitches": int(pitches) if pitches not in (None, "") else None,
+        "length": str(raw.get("length") or "").strip() or None,
+        "project_notes": raw.get("project_notes") or "",
+        "location": _parse_location(raw),
+        "date": date.fromisoformat(str(day).strip()) if day else None,
+        "style": _parse_choice(raw.get("style"), STYLE_NAMES, "style", default=STYLE_ATTEMPT),
+        "planned": _parse_flag(raw.get("planned"), "planned"),
+        "notes": raw.get("notes") or "",
+    }
+
+
+def _parse_choice(value, names, label, default):
+    if value is None or value == "":
+        return default
+    if isinstance(value, int) and not isinstance(value, bool):
+        code = value
+    else:
+        value = str(value).strip().lower()
+        if not value.isdigit():
+            if value not in names:
+                raise ValueError(f"Unknown {label} '{value}'.")
+            return names[value]
+        code = int(value)
+    # Numeric codes must be ones the API itself stores
+    if code not in names.values():
+        raise ValueError(f"Unknown {label} '{code}'.")
+    return code
+
+
+def _parse_flag(value, label):
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    value = str(value).strip().lower()
+    if value in ("", "0", "false", "no"):
+        return False
+    if value in ("1", "true", "yes"):
+        return True
+    raise ValueError(f"Invalid {label} '{value}'.")
+
+
+def _parse_location(raw):
+    """Return a (country_code, state_code, area, crag) key, or None."""
+    loc = raw.get("location")
+    if not isinstance(loc, dict):
+        loc = raw
+    area = str(loc.get("area") or "").strip()
+    if not area:
+        return None
+    country_code = str(loc.get("country_code") or "").strip().upper()
+    if not catalog.country_name(country_code):
+        raise ValueError(f"Invalid country code '{country_code}'.")
+    state_code = str(loc.get("state_code") or "").strip()
+    if state_code:
+        sub = catalog.subdivision(state_code)
+        if not sub:
+            raise ValueError(f"Invalid subdivision code '{state_code}'.")
+        state_code = sub["code"]
+    return (country_code, state_code, area, str(loc.get("crag") or "").strip())
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+# ---------------------------------------------------------------------------
+
+def _resolve_locations(keys):
+    """Map location keys to ids, inserting the ones that don't exist yet."""
+    if not keys:
+        return {}, 0
+    ids = {}
+    for loc in Location.query.filter(Location.area.in_({k[2] for k in keys})):
+        key = (loc.country_code, loc.state_code or "", loc.area, loc.crag or "")
+        ids.setdefault(key, loc.id)
+    new = sorted(k for k in keys if k not in ids)
+    if new:
+        country_ids = Country.ids_for({k[0] for k in new})
+        subdivision_ids = Subdivision.ids_for({k[1] for k in new if k[1]})
+        new_ids = db.session.scalars(
+            db.insert(Location).returning(Location.id, sort_by_parameter_order=True),
+            [
+                {
+                    "country_id": country_ids[country_code],
+                    "subdivision_id": subdivision_ids.get(state_code),
+                    "area": area,
+                    "crag": crag,
+                }
+                for country_code, state_code, area, crag in new
+            ],
+        ).all()
+        ids.update(zip(new, new_ids))
+    return ids, len(new)
+
+
+def _project_key(row, location_ids):
+    return (row["name"], row["grade"], row["type"], location_ids.get(row["location"]))
+
+
+def _resolve_projects(owner, rows, location_ids):
+    """Map project keys to ids, reusing the owner's matching projects."""
+    ids = {
+        (name, grade, climb_type, location_id): project_id
+        for project_id, name, grade, climb_type, location_id in db.session.query(
+            Project.id, Project.name, Project.grade, Project.type, Project.location_id
+        ).filter(Project.user_id == owner.id)
+    }
+    new = {}
+    for row in rows:
+        key = _project_key(row, location_ids)
+        if key not in ids and key not in new:
+            new[key] = row
+    if new:
+        new_ids = db.session.scalars(
+            db.insert(Project).returning(Project.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": owner.id,
+                    "name": name,
+                    "grade": grade,
+                    "type": climb_type,
+                    "location_id": location_id,
+                    "pitches": row["pitches"],
+                    "length": row["length"],
+                    "notes": row["project_notes"],
+                }
+                for (name, grade, climb_type, location_id), row in new.items()
+            ],
+        ).all()
+        ids.update(zip(new, new_ids))
+    return ids, len(new)
+
+
+@bp.route("/api/<username>/import", methods=["POST"])
+def import_logbook(username):
+    """Import projects, locations and sessions in a single transaction.
+
+    Locations are deduplicated against the existing table, projects
+    against the owner's existing ones (same name, grade, type, location)
+    and sessions against those projects' existing sessions.
+    Sessions are inserted in batches, then summaries and statuses are
+    recomputed once for everything touched, and the touched years' rollups
+    are queued as background jobs. Invalid rows are skipped and reported.
+    """
+    owner, err = _require_owner(username)
+    if err:
+        return err
+    started = time.perf_counter()
+    raw_rows, err = _read_rows()
+    if err:
+        return err
+    if len(raw_rows) > MAX_IMPORT_ROWS:
+        return jsonify({"error": f"At most {MAX_IMPORT_ROWS} rows per import"}), 413
+
+    rows, errors = [], []
+    for i, raw in enumerate(raw_rows, start=1):
+        try:
+            rows.append(_parse_row(raw))
+        except (ValueError, TypeError) as e:
+            errors.append({"row": i, "error": str(e)})
+
+    location_ids, locations_created = _resolve_locations({r["location"] for r in rows if r["location"]})
+    project_ids, projects_created = _resolve_projects(owner, rows, location_ids)
+    sessions = [
+        {
+            "project_id": project_ids[_project_key(r, location_ids)],
+            "date": r["date"],
+            "style": r["style"],
+            "planned": r["planned"],
+            "notes": r["notes"],
+        }
+        for r in rows if r["date"]
+    ]
+    # Skip sessions the owner already has, so re-running an import is safe
+    if sessions:
+        existing = set(db.session.execute(
+            db.select(Session.project_id, Session.date, Session.style, Session.planned)
+            .where(Session.project_id.in_({s["project_id"] for s in sessions}))
+        ).tuples())
+        logged = len(sessions)
+        queued = []
+        for s in sessions:
+            key = (s["project_id"], s["date"], s["style"], s["planned"])
+            # Also catches the same session repeated within this file
+            if key not in existing:
+                existing.add(key)
+                queued.append(s)
+        sessions = queued
+        sessions_skipped = logged - len(sessions)
+    else:
+        sessions_skipped = 0
+    for start in range(0, len(sessions), IMPORT_BATCH_SIZE):
+        db.session.execute(db.insert(Session), sessions[start:start + IMPORT_BATCH_SIZE])
+
+    touched = sorted({s["project_id"] for s in sessions})
+    if touched:
+        Project.refresh_summaries(touched)
+        jobs.queue_rollups(owner.id, {s["date"].year for s in sessions if not s["planned"]})
+    owner.bump_data_version()
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    return jsonify({
+        "rows": len(raw_rows),
+        "imported_rows": len(rows),
+        "locations_created": locations_created,
+        "projects_created": projects_created,
+        "sessions_created": len(sessions),
+        "sessions_skipped": sessions_skipped,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(len(raw_rows) / elapsed) if elapsed else None,
+        "error_count": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+    })
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _iter_rows(stmt):
+    """Yield row mappings of *stmt*, fetched in batches via a server-side cursor.
+
+    Runs on the session's Connection directly: these are plain column
+    selects, so the ORM result layer would only add per-row overhead.
+    """
+    result = db.session.connection().execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    yield from result.mappings()
+
+
+def _jsonable(row, **extra):
+    record = dict(extra)
+    for key, value in row.items():
+        record[key] = value.isoformat() if isinstance(value, date) else value
+    return record
+
+
+def _jsonl_lines(user_id):
+    """Locations, then projects, then sessions, one JSON object per line."""
+    dumps = current_app.json.dumps
+    user_projects = db.select(Project.location_id).where(Project.user_id == user_id)
+    locations = (
+        db.select(
+            Location.id, Country.code.label("country_code"), Country.name.label("country_name"),
+            db.func.coalesce(Subdivision.code, "").label("state_code"),
+            db.func.coalesce(Subdivision.name, "").label("state_name"),
+            Location.area, Location.crag,
+        )
+        .join(Country, Location.country_id == Country.id)
+        .outerjoin(Subdivision, Location.subdivision_id == Subdivision.id)
+        .where(Location.id.in_(user_projects))
+        .order_by(Location.id)
+    )
+    projects = (
+        db.select(
+            Project.id, Project.name, Project.grade, Project.type, Project.status,
+            Project.pitches, Project.length, Project.location_id, Project.notes,
+            Project.created_at,
+        )
+        .where(Project.user_id == user_id)
+        .order_by(Project.id)
+    )
+    sessions = (
+        db.select(
+            Session.id, Session.project_id, Session.date, Session.style,
+            Session.planned, Session.notes,
+        )
+        .join(Project, Session.project_id == Project.id)
+        .where(Project.user_id == user_id)
+        .order_by(Session.project_id, Session.date, Session.id)
+    )
+    for kind, stmt in (("location", locations), ("project", projects), ("session", sessions)):
+        for row in _iter_rows(stmt):
+            yield dumps(_jsonable(row, kind=kind)) + "\n"
+
+
+def _csv_lines(user_id):
+    """LOGBOOK_COLUMNS rows, the same format the import reads back."""
+    stmt = (
+        db.select(
+            Session.date, Session.style, Session.planned, Session.notes,
+            Project.name, Project.grade, Project.type, Project.pitches,
+            Project.length, Project.notes.label("project_notes"),
+            Country.code.label("country_code"), Subdivision.code.label("state_code"),
+            Location.area, Location.crag,
+        )
+        .select_from(Project)
+        .outerjoin(Session, Session.project_id == Project.id)
+        .outerjoin(Location, Project.location_id == Location.id)
+        .outerjoin(Country, Location.country_id == Country.id)
+        .outerjoin(Subdivision, Location.subdivision_id == Subdivision.id)
+        .where(Project.user_id == user_id)
+        .order_by(Project.id, Session.date, Session.id)
+    )
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(LOGBOOK_COLUMNS)
+    for row in _iter_rows(stmt):
+        writer.writerow([
+            row["date"].isoformat() if row["date"] else "",
+            STYLE_EXPORT_NAMES.get(row["style"], ""),
+            "true" if row["planned"] else "",
+            row["notes"] or "",
+            row["name"],
+            row["grade"],
+            TYPE_EXPORT_NAMES.get(row["type"], row["type"]),
+            row["pitches"] if row["pitches"] is not None else "",
+            row["length"] or "",
+            row["project_notes"] or "",
+            row["country_code"] or "",
+            row["state_code"] or "",
+            row["area"] or "",
+            row["crag"] or "",
+        ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+@bp.route("/api/<username>/export")
+def export_logbook(username):
+    """Stream the owner's locations, projects and sessions as a download.
+
+    ``?format=jsonl`` (default) writes one record per line tagged with its
+    ``kind``; ``?format=csv`` writes one row per session in the format
+    /import accepts. Rows come off server-side cursors and go out in
+    chunks, so memory stays flat however large the account is.
+    """
+    owner, err = _require_owner(username)
+    if err:
+        return err
+    fmt = request.args.get("format", "jsonl")
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": "format must be jsonl or csv"}), 400
+    lines = _csv_lines(owner.id) if fmt == "csv" else _jsonl_lines(owner.id)
+    response = Response(stream_with_context(_chunked(lines)), mimetype=EXPORT_MIMETYPES[fmt])
+    filename = f"kexian-{owner.username}-{date.today().isoformat()}.{fmt}"
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -1,20 +1,44 @@
-from flask import Blueprint, render_template, redirect, jsonify
+from flask import Blueprint, render_template, redirect, jsonify, request
 from flask_login import current_user
-from models import User
+from cache import get_user_by_username
+import database
+from models import db
+from routes import _get_user_or_404
+from routes.locations import user_location_list
+from routes.projects import enums, project_list, project_state_list, session_year_list
 
 bp = Blueprint("pages", __name__)
 
+# What each tab's page inlines for first paint. Tabs that don't render
+# projects don't pay for loading them; anything left out is fetched from the
+# API when the page needs it.
+TAB_BOOTSTRAP = {
+    "projects": {
+        "locations": user_location_list,
+        "session_years": session_year_list,
+        "project_states": project_state_list,
+        "projects": lambda user: project_list(user, request.args),
+    },
+    "locations": {"locations": user_location_list},
+}
+
 
 @bp.route("/health")
 def health():
     return jsonify({"status": "ok"})
 
 
+@bp.route("/health/pool")
+def health_pool():
+    """This worker's connection-pool usage (see database.py)."""
+    return jsonify(database.pool_stats(db.engine))
+
+
 @bp.route("/")
 def index():
     if current_user.is_authenticated:
         return redirect(f"/{current_user.username}/projects")
-    return render_template("index.html", profile_user=None)
+    return render_template("index.html", profile_user=None, bootstrap=bootstrap_payload(None))
 
 
 @bp.route("/<username>/projects")
@@ -23,7 +47,38 @@ def index():
 @bp.route("/<username>/locations")
 @bp.route("/<username>/profile")
 def spa_page(username):
-    user = User.query.filter_by(username=username).first()
+    user = get_user_by_username(username)
     if not user:
         return "User not found", 404
-    return render_template("index.html", profile_user=user)
+    tab = request.path.rstrip("/").rsplit("/", 1)[-1]
+    return render_template("index.html", profile_user=user, bootstrap=bootstrap_payload(user, tab))
+
+
+@bp.route("/api/<username>/bootstrap")
+def bootstrap(username):
+    """The same first-paint data spa_page inlines, for clients without the shell.
+
+    ``?tab=`` picks which page's data (default: projects).
+    """
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    return jsonify(bootstrap_payload(user, request.args.get("tab", "projects")))
+
+
+def bootstrap_payload(profile_user, tab="projects"):
+    """What the SPA requests on load of ``tab``, so first paint needs no API calls.
+
+    Projects are filtered by the page's own query string, which carries the
+    same status/type/state/date filters the projects tab sends.
+    """
+    payload = {
+        "me": current_user.to_dict() if current_user.is_authenticated else None,
+        "enums": enums(),
+    }
+    if profile_user is None:
+        payload["locations"] = []
+        return payload
+    for key, build in TAB_BOOTSTRAP.get(tab, {}).items():
+        payload[key] = build(profile_user)
+    return payload
@@ -1,8 +1,8 @@
 from datetime import date
 from flask import Blueprint, request, jsonify
-from models import db, Project, Session, Location, PROJECT_STATUS, PROJECT_TYPE
+import jobs
+from models import db, Project, Session, Location, SessionRollup, Subdivision, PROJECT_STATUS, PROJECT_TYPE
 from models.session import STYLE_FLASH, STYLE_SEND
-from datetime import timedelta
 from routes import _get_user_or_404, _require_owner
 
 bp = Blueprint("projects", __name__)
@@ -13,20 +13,15 @@ bp = Blueprint("projects", __name__)
 # ---------------------------------------------------------------------------
 
 def sync_project_status(project_id):
-    """Recalculate project status based on its sessions (ignoring planned)."""
-    project = db.session.get(Project, project_id)
-    if not project:
-        return
-    real_sessions = [s for s in project.sessions if not s.planned]
-    if not real_sessions:
-        project.status = 0  # To Try
-    elif any(s.style in (STYLE_FLASH, STYLE_SEND) for s in real_sessions):
-        project.status = 3  # Sent
-    elif project.last_session.date < date.today() - timedelta(days=180):
-        project.status = 2  # On Hold
-    else:
-        project.status = 1  # Projecting
-    db.session.commit()
+    """Recalculate project status from its activity summary in one UPDATE.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    db.session.execute(
+        db.update(Project)
+        .where(Project.id == project_id)
+        .values(status=Project.derived_status())
+    )
 
 
 VALID_BOULDER_GRADES = {f"V{i}" for i in range(11)}  # V0–V10
@@ -39,6 +34,8 @@ VALID_ROPE_GRADES = {
 
 def validate_grade(grade, climb_type):
     """Return an error string if the grade is invalid, else None."""
+    if climb_type not in PROJECT_TYPE:
+        return f"Invalid type '{climb_type}'."
     if not grade or not grade.strip():
         return "Grade is required."
     if climb_type == 1 and grade not in VALID_BOULDER_GRADES:
@@ -54,7 +51,11 @@ def validate_grade(grade, climb_type):
 
 @bp.route("/api/enums", methods=["GET"])
 def get_enums():
-    return jsonify({"statuses": PROJECT_STATUS, "types": PROJECT_TYPE})
+    return jsonify(enums())
+
+
+def enums():
+    return {"statuses": PROJECT_STATUS, "types": PROJECT_TYPE}
 
 
 # ---------------------------------------------------------------------------
@@ -66,10 +67,15 @@ def list_projects(username):
     user, err = _get_user_or_404(username)
     if err:
         return err
-    status_param = request.args.get("status", type=str)
-    climb_type = request.args.get("type", type=int)
-    state_filter = request.args.get("state", type=str)
-    date_filter = request.args.get("date", type=str)
+    return jsonify(project_list(user, request.args))
+
+
+def project_list(user, args):
+    """Serialized projects of ``user``, filtered by status/type/state/date in ``args``."""
+    status_param = args.get("status", type=str)
+    climb_type = args.get("type", type=int)
+    state_filter = args.get("state", type=str)
+    date_filter = args.get("date", type=str)
     query = Project.query.filter_by(user_id=user.id).order_by(Project.created_at.desc())
     if status_param:
         statuses = [int(s) for s in status_param.split(",") if s.isdigit()]
@@ -80,8 +86,13 @@ def list_projects(username):
     if state_filter:
         state_names = [s.strip() for s in state_filter.split(",") if s.strip()]
         if state_names:
-            query = query.filter(
-                Project.location.has(Location.state_name.in_(state_names))
+            # Names -> subdivision ids on the small reference table, then an
+            # indexed join instead of a correlated subquery per project
+            query = (
+                query.join(Location, Project.location_id == Location.id)
+                .filter(Location.subdivision_id.in_(
+                    db.select(Subdivision.id).where(Subdivision.name.in_(state_names))
+                ))
             )
     if date_filter:
         if date_filter == "ytd":
@@ -98,7 +109,13 @@ def list_projects(username):
                     (Session.date >= start) & (Session.date <= end) & (Session.planned == False)
                 )
             )
-    return jsonify([p.to_dict() for p in query.all()])
+    # Load sessions and locations for every row up front (one extra SELECT each)
+    # instead of lazy-loading them per project inside to_dict().
+    query = query.options(
+        db.selectinload(Project.sessions),
+        db.joinedload(Project.location),
+    )
+    return [p.to_dict() for p in query.all()]
 
 
 @bp.route("/api/<username>/project-states", methods=["GET"])
@@ -107,20 +124,20 @@ def project_states(username):
     user, err = _get_user_or_404(username)
     if err:
         return err
-    locs = (
-        db.session.query(Location.state_name, Location.state_code)
+    return jsonify(project_state_list(user))
+
+
+def project_state_list(user):
+    states = (
+        db.session.query(Subdivision.name, Subdivision.short_name)
+        .join(Location, Location.subdivision_id == Subdivision.id)
         .join(Project, Project.location_id == Location.id)
-        .filter(Project.user_id == user.id, Location.state_name != "")
+        .filter(Project.user_id == user.id)
         .distinct()
-        .order_by(Location.state_name)
+        .order_by(Subdivision.name)
         .all()
     )
-    results = []
-    for state_name, state_code in locs:
-        # Build a temporary location-like object to reuse state_short logic
-        loc = Location(state_name=state_name, state_code=state_code)
-        results.append({"state_name": state_name, "state_short": loc.state_short})
-    return jsonify(results)
+    return [{"state_name": name, "state_short": short} for name, short in states]
 
 
 @bp.route("/api/<username>/session-years", methods=["GET"])
@@ -129,15 +146,40 @@ def session_years(username):
     user, err = _get_user_or_404(username)
     if err:
         return err
+    return jsonify(session_year_list(user))
+
+
+def session_year_list(user):
     rows = (
-        db.session.query(db.func.extract("year", Session.date))
-        .join(Project, Session.project_id == Project.id)
-        .filter(Project.user_id == user.id, Session.planned == False)
+        db.session.query(SessionRollup.year)
+        .filter(SessionRollup.user_id == user.id)
         .distinct()
+        .order_by(SessionRollup.year.desc())
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+@bp.route("/api/<username>/year-totals", methods=["GET"])
+def year_totals(username):
+    """Return per-year session and send counts for this user, newest first."""
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    sends = db.func.sum(
+        db.case((SessionRollup.style.in_([STYLE_FLASH, STYLE_SEND]), SessionRollup.count), else_=0)
+    )
+    rows = (
+        db.session.query(SessionRollup.year, db.func.sum(SessionRollup.count), sends)
+        .filter(SessionRollup.user_id == user.id)
+        .group_by(SessionRollup.year)
+        .order_by(SessionRollup.year.desc())
         .all()
     )
-    years = sorted([int(r[0]) for r in rows], reverse=True)
-    return jsonify(years)
+    return jsonify([
+        {"year": year, "sessions": int(total), "sends": int(sent)}
+        for year, total, sent in rows
+    ])
 
 
 @bp.route("/api/<username>/projects", methods=["POST"])
@@ -161,6 +203,7 @@ def create_project(username):
         notes=data.get("notes", ""),
     )
     db.session.add(project)
+    owner.bump_data_version()
     db.session.commit()
     return jsonify(project.to_dict()), 201
 
@@ -180,9 +223,13 @@ def update_project(username, project_id):
     )
     if err_msg:
         return jsonify({"error": err_msg}), 400
+    old_type, old_grade = project.type, project.grade
     for col in ("name", "grade", "type", "status", "pitches", "length", "location_id", "notes"):
         if col in data:
             setattr(project, col, data[col])
+    if (project.type, project.grade) != (old_type, old_grade):
+        jobs.queue_rollups(owner.id, SessionRollup.years_of(project.id))
+    owner.bump_data_version()
     db.session.commit()
     return jsonify(project.to_dict())
 
@@ -194,6 +241,8 @@ def delete_project(username, project_id):
         return err
     project = db.session.get(Project, project_id)
     if project and project.user_id == owner.id:
+        jobs.queue_rollups(owner.id, SessionRollup.years_of(project.id))
         db.session.delete(project)
+        owner.bump_data_version()
         db.session.commit()
     return "", 204
@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify
+import search
+from models import db, Location, Project, Session, PROJECT_STATUS, PROJECT_TYPE
+from routes import _get_user_or_404
+
+bp = Blueprint("search", __name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _project_summary(project):
+    return {
+        "id": project.id,
+        "name": project.name,
+        "grade": project.grade,
+        "type": project.type,
+        "type_label": PROJECT_TYPE.get(project.type, "Unknown"),
+        "status": project.status,
+        "status_label": PROJECT_STATUS.get(project.status, "Unknown"),
+        "location_id": project.location_id,
+        "notes": project.notes or "",
+    }
+
+
+def _load(model, ids, *options):
+    if not ids:
+        return {}
+    rows = db.session.scalars(db.select(model).where(model.id.in_(ids)).options(*options))
+    return {row.id: row for row in rows}
+
+
+@bp.route("/api/<username>/search", methods=["GET"])
+def search_user_data(username):
+    """Ranked full-text search over a user's projects, sessions and locations.
+
+    ``?q=`` is matched word by word, each word as a prefix. Results are
+    ``{"items": [...], "next": offset}``; pass ``next`` back as ``?offset=``
+    for the following page, ``next`` is null on the last one.
+    """
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    query = request.args.get("q", "")
+    if not search.terms(query):
+        return jsonify({"error": "Search query is required"}), 400
+    limit = max(1, min(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    offset = max(0, request.args.get("offset", 0, type=int))
+
+    hits = search.find(user.id, query, limit + 1, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    hits = hits[:limit]
+
+    ids = {"project": [], "session": [], "location": []}
+    for hit in hits:
+        ids[hit.kind].append(hit.id)
+    # One query per kind, however many hits
+    sessions = _load(Session, ids["session"])
+    projects = _load(Project, ids["project"] + [s.project_id for s in sessions.values()])
+    locations = _load(Location, ids["location"])
+
+    items = []
+    for hit in hits:
+        item = {"kind": hit.kind, "rank": float(hit.rank)}
+        if hit.kind == "project":
+            item["project"] = _project_summary(projects[hit.id])
+        elif hit.kind == "session":
+            session = sessions[hit.id]
+            item["session"] = session.to_dict()
+            item["project"] = _project_summary(projects[session.project_id])
+        else:
+            location = locations[hit.id]
+            item["location"] = {**location.to_dict(), "display_name": location.display_name()}
+        items.append(item)
+    return jsonify({"items": items, "next": next_offset})
@@ -1,14 +1,28 @@
 from datetime import date
 from flask import Blueprint, request, jsonify
+import jobs
 from models import db, Project, Session
-from routes import _require_owner
+from routes import _get_user_or_404, _require_owner
 from routes.projects import sync_project_status
 
 bp = Blueprint("sessions", __name__)
 
 
+def _queue_rollups(project, *written):
+    """Queue the rollup recompute for the years of the (date, planned) sessions written."""
+    jobs.queue_rollups(project.user_id, [d.year for d, planned in written if not planned])
+
+
 @bp.route("/api/<username>/projects/<int:project_id>/sessions", methods=["GET"])
 def list_sessions(username, project_id):
+    user, err = _get_user_or_404(username)
+    if err:
+        return err
+    # Scoped to the user: the response's ETag comes from their data_version,
+    # which another user's project would never bump
+    project = db.session.get(Project, project_id)
+    if not project or project.user_id != user.id:
+        return jsonify({"error": "Project not found"}), 404
     sessions = (
         Session.query.filter_by(project_id=project_id)
         .order_by(Session.date.desc())
@@ -36,8 +50,11 @@ def create_session(username, project_id):
         notes=data.get("notes", ""),
     )
     db.session.add(s)
-    db.session.commit()
+    project.add_session_stats(s.date, s.style, s.planned)
+    _queue_rollups(project, (s.date, s.planned))
     sync_project_status(project_id)
+    owner.bump_data_version()
+    db.session.commit()
     return jsonify(s.to_dict()), 201
 
 
@@ -53,6 +70,7 @@ def update_session(username, session_id):
     if not project or project.user_id != owner.id:
         return jsonify({"error": "Forbidden"}), 403
     data = request.get_json(force=True)
+    before = (s.date, s.style, s.planned)
     if "date" in data:
         s.date = date.fromisoformat(data["date"])
     if "style" in data:
@@ -61,8 +79,13 @@ def update_session(username, session_id):
         s.planned = bool(data["planned"])
     if "notes" in data:
         s.notes = data["notes"]
-    db.session.commit()
+    if (s.date, s.style, s.planned) != before:
+        project.remove_session_stats(*before)
+        project.add_session_stats(s.date, s.style, s.planned)
+        _queue_rollups(project, (before[0], before[2]), (s.date, s.planned))
     sync_project_status(s.project_id)
+    owner.bump_data_version()
+    db.session.commit()
     return jsonify(s.to_dict())
 
 
@@ -77,6 +100,9 @@ def delete_session(username, session_id):
         if project and project.user_id == owner.id:
             project_id = s.project_id
             db.session.delete(s)
-            db.session.commit()
+            project.remove_session_stats(s.date, s.style, s.planned)
+            _queue_rollups(project, (s.date, s.planned))
             sync_project_status(project_id)
+            owner.bump_data_version()
+            db.session.commit()
     return "", 204
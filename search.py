@@ -0,0 +1,234 @@
+"""Full-text search over a user's projects, sessions and locations.
+
+Two backends behind one find():
+
+- PostgreSQL: a generated ``search_vector`` tsvector column on projects
+  (name, notes), sessions (notes) and locations (area, crag), each with a GIN
+  index. Postgres keeps the columns current on every write.
+- SQLite (local runs): FTS5 external-content tables projects_fts,
+  sessions_fts and locations_fts, kept in sync by triggers.
+
+Both tokenize without stemming ('simple' / unicode61), so the two return the
+same matches. Every query term must match, as a prefix ("butter coun" finds
+"Buttermilk Country"). Lookups go through the full-text index first, so
+their cost follows the number of matches, not the number of rows a user has.
+
+find_locations() is the location picker's typeahead: a substring match over
+the whole shared locations table, which on Postgres a pg_trgm GIN index on
+LOCATION_TEXT answers without scanning it.
+
+None of these columns, indexes or tables are on the models; they are created
+by the add_full_text_search / add_location_trigram_index migrations and, for
+create_all() databases, by the DDL hooks below. migrations/env.py hides
+them from autogenerate via is_search_object().
+"""
+import re
+
+from sqlalchemy import DDL, event
+
+from models import db, Location, Project, Session, Subdivision
+
+TERM_RE = re.compile(r"\w+")
+MAX_TERMS = 8
+
+# What the typeahead matches locations' own text against; the trigram index
+# is on this exact expression, so queries must use it verbatim for Postgres
+# to pick the index. States live on the subdivisions table and are matched
+# there.
+LOCATION_TEXT = "lower(area || ' ' || coalesce(crag, ''))"
+# Shorter words have no complete trigram, so a query of only those would scan
+# the whole table
+MIN_LOCATION_TERM = 3
+
+# (table, indexed expression with tsvector weights)
+PG_VECTORS = {
+    "projects": "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+    "sessions": "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+    "locations": "setweight(to_tsvector('simple', coalesce(area, '')), 'A') || "
+                 "setweight(to_tsvector('simple', coalesce(crag, '')), 'A')",
+}
+
+# table -> indexed columns; each gets a <table>_fts FTS5 table
+FTS_COLUMNS = {
+    "projects": ["name", "notes"],
+    "sessions": ["notes"],
+    "locations": ["area", "crag"],
+}
+
+
+def pg_ddl(table):
+    """Statements adding the generated tsvector column and its GIN index."""
+    return [
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({PG_VECTORS[table]}) STORED",
+        f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)",
+    ]
+
+
+def sqlite_ddl(table):
+    """Statements creating the FTS5 table for ``table`` and its sync triggers."""
+    columns = FTS_COLUMNS[table]
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    fts = f"{table}_fts"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+        # Index rows that existed before the table did
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+PG_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX ix_locations_text_trgm ON locations USING gin (({LOCATION_TEXT}) gin_trgm_ops)",
+]
+
+
+def is_search_object(type_, name):
+    """True for the search structures above, which the models don't declare."""
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "index":
+        return name.endswith(("_search_vector", "_trgm"))
+    if type_ == "table":
+        # FTS5 also creates <name>_data, _idx, _docsize and _config tables
+        return any(name == f"{t}_fts" or name.startswith(f"{t}_fts_") for t in FTS_COLUMNS)
+    return False
+
+
+for _model in (Project, Session, Location):
+    _table = _model.__table__
+    for _statement in pg_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    for _statement in sqlite_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in PG_TRGM_DDL:
+    event.listen(Location.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def terms(query):
+    """Lower-cased word terms of a free-text query (punctuation dropped)."""
+    return TERM_RE.findall((query or "").lower())[:MAX_TERMS]
+
+
+# Each branch yields (kind, id, rank), higher rank first
+PG_SEARCH = """
+    WITH q AS (SELECT to_tsquery('simple', :query) AS query)
+    SELECT 'project' AS kind, p.id AS id, ts_rank(p.search_vector, q.query) AS rank
+    FROM projects p, q
+    WHERE p.search_vector @@ q.query AND p.user_id = :user_id
+    UNION ALL
+    SELECT 'session', s.id, ts_rank(s.search_vector, q.query)
+    FROM sessions s JOIN projects p ON p.id = s.project_id, q
+    WHERE s.search_vector @@ q.query AND p.user_id = :user_id
+    UNION ALL
+    SELECT 'location', l.id, ts_rank(l.search_vector, q.query)
+    FROM locations l, q
+    WHERE l.search_vector @@ q.query
+      AND l.id IN (SELECT location_id FROM projects WHERE user_id = :user_id)
+    ORDER BY rank DESC, kind, id
+    LIMIT :limit OFFSET :offset
+"""
+
+# bm25() is lower-is-better, so negate it; column weights follow the tsvector ones
+SQLITE_SEARCH = """
+    SELECT 'project' AS kind, p.id AS id, -bm25(projects_fts, 10.0, 4.0) AS rank
+    FROM projects_fts JOIN projects p ON p.id = projects_fts.rowid
+    WHERE projects_fts MATCH :query AND p.user_id = :user_id
+    UNION ALL
+    SELECT 'session', s.id, -bm25(sessions_fts, 4.0)
+    FROM sessions_fts
+    JOIN sessions s ON s.id = sessions_fts.rowid
+    JOIN projects p ON p.id = s.project_id
+    WHERE sessions_fts MATCH :query AND p.user_id = :user_id
+    UNION ALL
+    SELECT 'location', l.id, -bm25(locations_fts, 10.0, 10.0)
+    FROM locations_fts JOIN locations l ON l.id = locations_fts.rowid
+    WHERE locations_fts MATCH :query
+      AND l.id IN (SELECT location_id FROM projects WHERE user_id = :user_id)
+    ORDER BY rank DESC, kind, id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _match_expression(dialect, words):
+    if dialect == "postgresql":
+        return " & ".join(f"{w}:*" for w in words)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def find(user_id, query, limit, offset=0):
+    """Return up to ``limit`` ranked (kind, id, rank) hits after ``offset``.
+
+    ``kind`` is 'project', 'session' or 'location'.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    dialect = db.session.get_bind().dialect.name
+    sql = PG_SEARCH if dialect == "postgresql" else SQLITE_SEARCH
+    return db.session.execute(db.text(sql), {
+        "query": _match_expression(dialect, words),
+        "user_id": user_id,
+        "limit": limit,
+        "offset": offset,
+    }).all()
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def find_locations(query, limit):
+    """Locations whose area, crag or state contain every word of ``query``.
+
+    Best matches first: area or crag starting with the query, then a word
+    starting with it, then (on Postgres) trigram similarity. Returns [] unless
+    some word is at least MIN_LOCATION_TERM characters long.
+    """
+    words = (query or "").lower().split()
+    if not any(len(word) >= MIN_LOCATION_TERM for word in words):
+        return []
+    query = " ".join(words)
+    text = db.literal_column(LOCATION_TEXT)
+    prefix = _escape_like(query) + "%"
+    relevance = db.case(
+        (db.or_(
+            db.func.lower(Location.area).like(prefix, escape="\\"),
+            db.func.lower(Location.crag).like(prefix, escape="\\"),
+        ), 0),
+        (text.like("% " + prefix, escape="\\"), 1),
+        else_=2,
+    )
+    order = [relevance]
+    if db.session.get_bind().dialect.name == "postgresql":
+        order.append(db.func.similarity(text, query).desc())
+    matches = []
+    for word in words:
+        pattern = f"%{_escape_like(word)}%"
+        # subdivisions only holds the states in use, so this stays small
+        states = db.select(Subdivision.id).where(db.or_(
+            db.func.lower(Subdivision.name).like(pattern, escape="\\"),
+            db.func.lower(Subdivision.short_name) == word,
+        ))
+        matches.append(db.or_(
+            text.like(pattern, escape="\\"), Location.subdivision_id.in_(states)
+        ))
+    stmt = (
+        db.select(Location)
+        .where(*matches)
+        .order_by(*order, db.func.length(Location.area), Location.area, Location.crag, Location.id)
+        .limit(limit)
+    )
+    return db.session.scalars(stmt).all()
@@ -0,0 +1,91 @@
+"""Per-request SQL statistics.
+
+Cursor events count the statements each request runs and the time spent in
+them, reported in a ``Server-Timing`` header (visible in the browser's
+network panel):
+
+    Server-Timing: db;dur=12.4;desc="7 queries", app;dur=31.0
+
+Statements slower than KEXIAN_SLOW_QUERY_MS (200) are logged to
+``kexian.sql`` with the endpoint that ran them.
+
+Strict mode catches N+1 regressions: with ``SQL_REPEAT_LIMIT`` set (config,
+or KEXIAN_SQL_REPEAT_LIMIT in the environment), a request that runs the same
+SELECT more than that many times fails with RepeatedQueryError. It is meant
+for tests and local runs, not production.
+"""
+import logging
+import os
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+log = logging.getLogger("kexian.sql")
+
+SLOW_QUERY_MS = float(os.environ.get("KEXIAN_SLOW_QUERY_MS", 200))
+
+
+class RepeatedQueryError(RuntimeError):
+    """A request ran the same SELECT more often than SQL_REPEAT_LIMIT allows."""
+
+
+def init_app(app, db):
+    app.config.setdefault(
+        "SQL_REPEAT_LIMIT", int(os.environ.get("KEXIAN_SQL_REPEAT_LIMIT", 0)) or None
+    )
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        limit = has_request_context() and current_app.config["SQL_REPEAT_LIMIT"]
+        # Only SELECTs: batched INSERTs legitimately repeat one statement
+        if limit and statement.lstrip()[:6].upper() == "SELECT":
+            shapes = g.setdefault("sql_shapes", Counter())
+            shapes[statement] += 1
+            if shapes[statement] > limit:
+                raise RepeatedQueryError(
+                    f"{request.endpoint} ran this statement {shapes[statement]} times "
+                    f"(SQL_REPEAT_LIMIT={limit}):\n{statement}"
+                )
+        # Pushed last, so a raise above leaves nothing behind on the pooled
+        # connection; _after pops it, or _failed if the statement raises
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if has_request_context():
+            g.sql_count = g.get("sql_count", 0) + 1
+            g.sql_time = g.get("sql_time", 0.0) + elapsed
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            endpoint = request.endpoint if has_request_context() else None
+            log.warning("slow query (%.0f ms) in %s: %s", elapsed * 1000, endpoint, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    @app.before_request
+    def _start_clock():
+        g.request_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_shapes = Counter()
+
+    @app.after_request
+    def _server_timing(response):
+        start = g.get("request_start")
+        if start is None:
+            return response
+        count = g.get("sql_count", 0)
+        db_ms = g.get("sql_time", 0.0) * 1000
+        app_ms = (time.perf_counter() - start) * 1000
+        response.headers.add(
+            "Server-Timing", f'db;dur={db_ms:.1f};desc="{count} queries", app;dur={app_ms:.1f}'
+        )
+        return response
@@ -0,0 +1,47 @@
+"""Optional startup timing, enabled with KEXIAN_STARTUP_TIMING=1.
+
+Imported first thing in app.py so the clock starts before Flask and the
+models load. Logs how long the app module took to import and how long the
+first request took once it arrives.
+"""
+import logging
+import os
+import time
+
+STARTED = time.perf_counter()
+ENABLED = os.environ.get("KEXIAN_STARTUP_TIMING") == "1"
+
+log = logging.getLogger("kexian.startup")
+
+
+def init_app(app):
+    """Log import time now and first-request timings when they happen."""
+    if not ENABLED:
+        return
+    from flask import request
+
+    if not log.handlers:
+        logging.basicConfig(level=logging.INFO)
+    log.setLevel(logging.INFO)
+    log.info("app import: %.1f ms (pid %d)", (time.perf_counter() - STARTED) * 1000, os.getpid())
+
+    state = {"pending": True}
+
+    @app.before_request
+    def _mark_first_request():
+        if state.get("pending"):
+            state["t0"] = time.perf_counter()
+
+    @app.after_request
+    def _log_first_request(response):
+        if state.pop("pending", False):
+            now = time.perf_counter()
+            log.info(
+                "first request %s -> %d: %.1f ms (%.1f ms since import start, pid %d)",
+                request.path,
+                response.status_code,
+                (now - state["t0"]) * 1000,
+                (now - STARTED) * 1000,
+                os.getpid(),
+            )
+        return response
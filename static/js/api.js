@@ -5,6 +5,16 @@
 export let currentUser = null;
 export const profileUser = window.__PROFILE_USER__;
 
+// First-paint data inlined by the server (see bootstrap_payload in
+// routes/pages.py). Each entry is handed out once; later loads hit the API.
+const bootstrap = window.__BOOTSTRAP__ || {};
+
+export function takeBootstrap(key) {
+    const value = bootstrap[key];
+    delete bootstrap[key];
+    return value;
+}
+
 export function setCurrentUser(user) {
     currentUser = user;
 }
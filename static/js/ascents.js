@@ -8,7 +8,7 @@ let boulderChart = null;
 let routeChart = null;
 let ascentsYear = "";          // "" = all time, "ytd", or "2025"
 let yearOptions = [];
-let lastAscentsData = [];      // cache for drill-down
+let lastAscentsData = null;    // full send list, fetched on first drill-down
 
 // ---------------------------------------------------------------------------
 // Grade bucket helpers
@@ -38,12 +38,23 @@ function routeBucket(grade) {
 // Data fetching
 // ---------------------------------------------------------------------------
 
+function yearQuery() {
+    if (ascentsYear === "ytd") return "ytd=1";
+    if (ascentsYear) return `year=${ascentsYear}`;
+    return "";
+}
+
 async function fetchAscents() {
     if (!profileUser) return [];
-    let url = `${apiBase()}/ascents`;
-    if (ascentsYear === "ytd") url += "?ytd=1";
-    else if (ascentsYear) url += `?year=${ascentsYear}`;
-    return api(url);
+    const qs = yearQuery();
+    return api(`${apiBase()}/ascents${qs ? `?${qs}` : ""}`);
+}
+
+/** Send counts grouped server-side by grade/type/style, rope grades MP-bucketed. */
+async function fetchPyramid() {
+    if (!profileUser) return [];
+    const qs = yearQuery();
+    return api(`${apiBase()}/ascents/pyramid?buckets=mp${qs ? `&${qs}` : ""}`);
 }
 
 async function fetchYears() {
@@ -62,12 +73,11 @@ async function fetchYears() {
 // Chart rendering
 // ---------------------------------------------------------------------------
 
-function buildCounts(data, grades, typeCodes, bucketFn) {
+function buildCounts(pyramid, grades, typeCodes) {
     const counts = {};
     grades.forEach(g => { counts[g] = 0; });
-    data.filter(d => typeCodes.includes(d.type)).forEach(d => {
-        const key = bucketFn ? bucketFn(d.grade) : d.grade;
-        if (key && key in counts) counts[key]++;
+    pyramid.filter(d => typeCodes.includes(d.type)).forEach(d => {
+        if (d.grade in counts) counts[d.grade] += d.count;
     });
     return grades.map(g => counts[g]);
 }
@@ -136,7 +146,8 @@ function makeChart(canvasId, labels, data, color, title, onClick) {
 // Drill-down modal
 // ---------------------------------------------------------------------------
 
-function showDrillDown(bucketLabel, typeCodes, bucketFn) {
+async function showDrillDown(bucketLabel, typeCodes, bucketFn) {
+    if (!lastAscentsData) lastAscentsData = await fetchAscents();
     const matches = lastAscentsData
         .filter(d => typeCodes.includes(d.type))
         .filter(d => {
@@ -179,17 +190,17 @@ document.addEventListener("click", (e) => {
 
 export async function renderAscentsTab() {
     await fetchYears();
-    const data = await fetchAscents();
-    lastAscentsData = data;
+    const pyramid = await fetchPyramid();
+    lastAscentsData = null;
 
     // Boulder chart
-    const boulderCounts = buildCounts(data, BOULDER_GRADES, [1], null);
+    const boulderCounts = buildCounts(pyramid, BOULDER_GRADES, [1]);
     if (boulderChart) boulderChart.destroy();
     boulderChart = makeChart("chart-boulders", BOULDER_GRADES, boulderCounts, "#22c55e", "Boulders by Grade",
         (label) => showDrillDown(label, [1], null));
 
     // Route chart
-    const routeCounts = buildCounts(data, ROUTE_BUCKETS, [0, 2], routeBucket);
+    const routeCounts = buildCounts(pyramid, ROUTE_BUCKETS, [0, 2]);
     if (routeChart) routeChart.destroy();
     routeChart = makeChart("chart-routes", ROUTE_BUCKETS, routeCounts, "#ef4444", "Rock Routes by Grade",
         (label) => showDrillDown(label, [0, 2], routeBucket));
@@ -2,12 +2,13 @@
 // auth.js – Login, signup, logout, auth nav
 // ---------------------------------------------------------------------------
 
-import { currentUser, setCurrentUser, isOwner, esc } from "./api.js";
+import { currentUser, setCurrentUser, isOwner, esc, takeBootstrap } from "./api.js";
 import { switchTab, getActiveTab } from "./router.js";
 
 export async function fetchCurrentUser() {
-    const res = await fetch("/api/auth/me");
-    setCurrentUser(await res.json());
+    let me = takeBootstrap("me");
+    if (me === undefined) me = await (await fetch("/api/auth/me")).json();
+    setCurrentUser(me);
     renderAuthNav();
     renderOwnerUI();
     if (getActiveTab() === "profile") populateProfile();
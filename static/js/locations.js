@@ -2,20 +2,30 @@
 // locations.js – Location modal & cascading country → state, plus management
 // ---------------------------------------------------------------------------
 
-import { api, esc, isOwner } from "./api.js";
+import { api, apiBase, esc, isOwner, profileUser, takeBootstrap } from "./api.js";
 
+// The profile user's locations. The shared catalogue is only ever searched
+// (see initLocationSearch), never downloaded whole.
 let locations = [];
+// Found via search in the project form but not used by a project yet
+let picked = [];
+
+const SEARCH_MIN_CHARS = 3;
+const SEARCH_DEBOUNCE_MS = 150;
 
 export function getLocations() { return locations; }
 
 export function populateLocationSelect() {
     const select = document.getElementById("project-location");
+    const value = select.value;
+    const extra = picked.filter(p => !locations.some(l => l.id === p.id));
     select.innerHTML = `<option value="">— None —</option>` +
-        locations.map(l => `<option value="${l.id}">${esc(l.crag || l.area)}</option>`).join("");
+        [...locations, ...extra].map(l => `<option value="${l.id}">${esc(l.crag || l.area)}</option>`).join("");
+    select.value = value;
 }
 
 export async function loadLocations() {
-    locations = await api("/api/locations");
+    locations = takeBootstrap("locations") ?? (profileUser ? await api(`${apiBase()}/locations`) : []);
     populateLocationSelect();
     renderLocationsTab();
 }
@@ -117,10 +127,60 @@ window.deleteLocation = async function (id) {
     }
 };
 
+// ---------------------------------------------------------------------------
+// Project form – typeahead over all locations
+// ---------------------------------------------------------------------------
+function initLocationSearch() {
+    const input = document.getElementById("project-location-search");
+    const results = document.getElementById("project-location-results");
+    const select = document.getElementById("project-location");
+    if (!input) return;
+    let timer = null;
+    let seq = 0;
+    let found = [];
+
+    const hide = () => { results.classList.add("hidden"); results.innerHTML = ""; };
+
+    input.addEventListener("input", () => {
+        clearTimeout(timer);
+        const q = input.value.trim();
+        if (q.length < SEARCH_MIN_CHARS) { seq++; hide(); return; }
+        timer = setTimeout(async () => {
+            const mine = ++seq;
+            const hits = await api(`/api/locations/search?q=${encodeURIComponent(q)}`);
+            if (mine !== seq) return;  // a newer keystroke already answered
+            found = hits;
+            if (!found.length) {
+                results.innerHTML = `<li class="typeahead-empty">No matches</li>`;
+            } else {
+                results.innerHTML = found.map(l =>
+                    `<li data-id="${l.id}">${esc(l.display_name)}</li>`).join("");
+            }
+            results.classList.remove("hidden");
+        }, SEARCH_DEBOUNCE_MS);
+    });
+
+    results.addEventListener("mousedown", (e) => {
+        const li = e.target.closest("li[data-id]");
+        if (!li) return;
+        e.preventDefault();
+        const loc = found.find(l => l.id === Number(li.dataset.id));
+        if (!picked.some(p => p.id === loc.id)) picked.push(loc);
+        populateLocationSelect();
+        select.value = loc.id;
+        input.value = "";
+        hide();
+    });
+
+    input.addEventListener("blur", hide);
+}
+
 // ---------------------------------------------------------------------------
 // Init – wire up modals (create + edit)
 // ---------------------------------------------------------------------------
 export function initLocationModal() {
+    initLocationSearch();
+
     // --- Create location modal (from project form) ---
     const locationModal = document.getElementById("location-modal");
     const locationForm = document.getElementById("location-form");
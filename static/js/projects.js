@@ -2,7 +2,7 @@
 // projects.js – Project list, render, sort, filter, CRUD modal
 // ---------------------------------------------------------------------------
 
-import { api, apiBase, isOwner, profileUser, esc } from "./api.js";
+import { api, apiBase, isOwner, profileUser, esc, takeBootstrap } from "./api.js";
 import {
     filterStatus, filterType, filterState, filterDate,
     setFilterStatus, setFilterType, setFilterState, setFilterDate,
@@ -38,7 +38,7 @@ window.deleteSession = deleteSession;
 
 async function populateDateFilter() {
     if (!profileUser) return;
-    const years = await api(`${apiBase()}/session-years`);
+    const years = takeBootstrap("session_years") ?? await api(`${apiBase()}/session-years`);
     if (JSON.stringify(years) === JSON.stringify(dateFilterYears)) return;
     dateFilterYears = years;
     const sel = document.getElementById("filter-date");
@@ -49,7 +49,7 @@ async function populateDateFilter() {
 
 async function populateStateFilter() {
     if (!profileUser) return;
-    const states = await api(`${apiBase()}/project-states`);
+    const states = takeBootstrap("project_states") ?? await api(`${apiBase()}/project-states`);
     if (JSON.stringify(states) === JSON.stringify(stateFilterOptions)) return;
     stateFilterOptions = states;
     const wrap = document.getElementById("filter-state");
@@ -88,7 +88,7 @@ export async function loadProjects() {
     if (filterState !== "") params.set("state", filterState);
     if (filterDate !== "") params.set("date", filterDate);
     const qs = params.toString() ? `?${params}` : "";
-    allProjects = await api(`${apiBase()}/projects${qs}`);
+    allProjects = takeBootstrap("projects") ?? await api(`${apiBase()}/projects${qs}`);
     updateURL();
     renderProjects();
 }
@@ -97,8 +97,7 @@ export async function loadProjects() {
 const STATUS_ORDER = { 1: 0, 0: 1, 3: 2, 2: 3 };
 
 function getLastSessionDate(p) {
-    const real = (p.sessions || []).filter(s => !s.planned);
-    return real.length ? real[0].date : "";
+    return p.last_session_date || "";
 }
 
 function sortProjects(projects) {
@@ -128,10 +127,8 @@ function sortProjects(projects) {
                 vb = getLastSessionDate(b);
                 break;
             case "next_session":
-                const ap = (a.sessions || []).filter(s => s.planned);
-                const bp = (b.sessions || []).filter(s => s.planned);
-                va = ap.length ? ap[ap.length - 1].date : "";
-                vb = bp.length ? bp[bp.length - 1].date : "";
+                va = a.next_session_date || "";
+                vb = b.next_session_date || "";
                 break;
             default: va = 0; vb = 0;
         }
@@ -176,10 +173,8 @@ function renderProjects() {
 
     for (const p of sorted) {
         const locName = p.location ? esc([p.location.crag, p.location.state_short || p.location.state_name].filter(Boolean).join(", ")) : "";
-        const realSessions = p.sessions ? p.sessions.filter(s => !s.planned) : [];
-        const plannedSessions = p.sessions ? p.sessions.filter(s => s.planned) : [];
-        const lastDate = realSessions.length ? realSessions[0].date : "";
-        const nextDate = plannedSessions.length ? plannedSessions[plannedSessions.length - 1].date : "";
+        const lastDate = p.last_session_date || "";
+        const nextDate = p.next_session_date || "";
         const sessionCount = p.sessions ? p.sessions.length : 0;
 
         const sessionsHtml = sessionCount
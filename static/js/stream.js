@@ -6,6 +6,11 @@ import { api, apiBase, profileUser, esc } from "./api.js";
 
 let streamYear = "";           // "" = all time, "ytd", or "2025"
 let yearOptions = [];
+let streamEntries = [];        // pages loaded so far
+let nextCursor = null;         // keyset cursor for the next page, null when done
+let loadSeq = 0;               // guards against out-of-order page responses
+
+const PAGE_SIZE = 100;
 
 const MONTH_NAMES = [
     "January", "February", "March", "April", "May", "June",
@@ -18,12 +23,13 @@ const DAY_NAMES = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"];
 // Data fetching
 // ---------------------------------------------------------------------------
 
-async function fetchStream() {
-    if (!profileUser) return [];
-    let url = `${apiBase()}/stream`;
-    if (streamYear === "ytd") url += "?ytd=1";
-    else if (streamYear) url += `?year=${streamYear}`;
-    return api(url);
+async function fetchStreamPage(cursor) {
+    if (!profileUser) return { items: [], next: null };
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (streamYear === "ytd") params.set("ytd", "1");
+    else if (streamYear) params.set("year", streamYear);
+    if (cursor) params.set("cursor", cursor);
+    return api(`${apiBase()}/stream?${params}`);
 }
 
 async function fetchYears() {
@@ -119,14 +125,19 @@ function dayLocation(entries) {
 // Rendering
 // ---------------------------------------------------------------------------
 
-function monthHeader(key, entries) {
+/** `complete` is false for a month that continues on pages not loaded yet */
+function monthHeader(key, entries, complete) {
     const [y, m] = key.split("-");
     const monthName = MONTH_NAMES[parseInt(m, 10) - 1];
     const sessions = entries.length;
     const sends = entries.filter(e => e.style === 1 || e.style === 2).length;
 
-    let summary = `${plural(sessions, "session")}`;
-    if (sends) summary += ` · ${plural(sends, "send")}`;
+    // Counts of a partly loaded month would be wrong; leave them out
+    let summary = "";
+    if (complete) {
+        summary = `${plural(sessions, "session")}`;
+        if (sends) summary += ` · ${plural(sends, "send")}`;
+    }
 
     return `<div class="stream-month-header">
         <span class="stream-month-name">${monthName} ${y}</span>
@@ -177,23 +188,47 @@ function dateGroupHTML(dateStr, entries) {
 // Public API
 // ---------------------------------------------------------------------------
 
-export async function renderStreamTab() {
-    await fetchYears();
-    const data = await fetchStream();
+function renderStreamList() {
     const container = document.getElementById("stream-list");
     if (!container) return;
 
-    if (!data.length) {
+    if (!streamEntries.length) {
         container.innerHTML = `<p class="empty-msg">No sessions to show.</p>`;
         return;
     }
 
-    const months = groupByMonth(data);
-    container.innerHTML = months.map(({ key, entries }) => {
+    // Pages run newest first, so only the oldest month loaded can be partial
+    const months = groupByMonth(streamEntries);
+    container.innerHTML = months.map(({ key, entries }, i) => {
         const days = groupByDate(entries);
-        return monthHeader(key, entries) +
+        const complete = !nextCursor || i < months.length - 1;
+        return monthHeader(key, entries, complete) +
             `<div class="stream-month-entries">${days.map(d => dateGroupHTML(d.date, d.entries)).join("")}</div>`;
-    }).join("");
+    }).join("") + (nextCursor
+        ? `<div class="stream-more"><button class="btn-small" id="stream-load-more">Load more</button></div>`
+        : "");
+
+    document.getElementById("stream-load-more")?.addEventListener("click", loadMoreStream);
+}
+
+async function loadMoreStream() {
+    if (!nextCursor) return;
+    const seq = loadSeq;
+    const page = await fetchStreamPage(nextCursor);
+    if (seq !== loadSeq) return;
+    streamEntries = streamEntries.concat(page.items);
+    nextCursor = page.next;
+    renderStreamList();
+}
+
+export async function renderStreamTab() {
+    const seq = ++loadSeq;
+    await fetchYears();
+    const page = await fetchStreamPage(null);
+    if (seq !== loadSeq) return;
+    streamEntries = page.items;
+    nextCursor = page.next;
+    renderStreamList();
 }
 
 export function initStream() {
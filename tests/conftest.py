@@ -0,0 +1,97 @@
+"""Shared fixtures: the app on a throwaway SQLite database per test.
+
+DATABASE_URL must be set before app.py is imported, since it configures the
+engine at import time.
+"""
+import os
+import tempfile
+
+import pytest
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="kexian-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("JOBS_EAGER", "1")  # run background jobs inline, after each commit
+
+from app import app as flask_app  # noqa: E402
+from models import db as _db, User  # noqa: E402
+import cache  # noqa: E402
+
+# Strict mode (see sqlstats.py): a request running one SELECT more often
+# than this fails the test, which catches N+1 queries as they creep in
+SQL_REPEAT_LIMIT = 2
+
+
+@pytest.fixture
+def app():
+    flask_app.config["TESTING"] = True
+    flask_app.config["SQL_REPEAT_LIMIT"] = SQL_REPEAT_LIMIT
+    with flask_app.app_context():
+        # A new file each test: the search triggers and FTS tables aren't
+        # on the models, so drop_all() wouldn't remove them
+        _db.engine.dispose()
+        if os.path.exists(DB_PATH):
+            os.remove(DB_PATH)
+        _db.create_all()
+        cache._users.clear()
+        cache._user_ids.clear()
+        yield flask_app
+        _db.session.remove()
+        _db.engine.dispose()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def allow_sql_repeats(app, monkeypatch):
+    """Turn strict mode off, for a test whose requests repeat a SELECT on purpose."""
+    monkeypatch.setitem(app.config, "SQL_REPEAT_LIMIT", None)
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="alice")
+    user.set_password("secret1")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def login(client):
+    """Return a function that signs ``client`` in as the given user."""
+    def sign_in(user, password="secret1"):
+        response = client.post("/api/auth/login", json={"username": user.username, "password": password})
+        assert response.status_code == 200
+        return client
+
+    return sign_in
+
+
+@pytest.fixture
+def count_queries(db):
+    """Return a context manager collecting the SQL statements run inside it."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    return counting
@@ -0,0 +1,140 @@
+import base64
+from datetime import date
+
+import pytest
+
+from models import Project, Session, SessionRollup
+
+
+@pytest.fixture
+def logbook(db, user):
+    """Eleven sessions over four days, several on the same date."""
+    boulder = Project(user_id=user.id, name="Moonlight", grade="V4", type=1)
+    route = Project(user_id=user.id, name="Pinched", grade="5.12a", type=0)
+    days = [date(2024, 3, 1)] * 4 + [date(2024, 2, 10)] * 3 + [date(2023, 12, 31)] * 3 + [date(2023, 5, 5)]
+    for i, day in enumerate(days):
+        project = boulder if i % 2 else route
+        project.sessions.append(Session(date=day, style=i % 3, notes=f"s{i}"))
+    boulder.sessions.append(Session(date=date(2030, 1, 1), planned=True, notes="planned"))
+    db.session.add_all([boulder, route])
+    db.session.commit()
+    return user
+
+
+def _pages(client, url, limit):
+    items, cursor = [], None
+    while True:
+        page_url = f"{url}{'&' if '?' in url else '?'}limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(page_url)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        cursor = page["next"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 11, 50])
+def test_pages_cover_the_full_list_across_same_day_ties(client, logbook, limit):
+    full = client.get("/api/alice/stream").get_json()
+    assert len(full) == 11
+    assert [s["date"] for s in full] == sorted((s["date"] for s in full), reverse=True)
+
+    assert _pages(client, "/api/alice/stream", limit) == full
+
+
+def test_paging_applies_the_filters(client, logbook):
+    for url in ("/api/alice/ascents", "/api/alice/stream?year=2024", "/api/alice/ascents?year=2023"):
+        assert _pages(client, url, 2) == client.get(url).get_json()
+
+
+def test_last_page_has_no_next_cursor(client, logbook):
+    page = client.get("/api/alice/stream?limit=11").get_json()
+    assert len(page["items"]) == 11
+    assert page["next"] is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    base64.urlsafe_b64encode(b"yesterday:3").decode(),
+    base64.urlsafe_b64encode(b"2024-03-01:three").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_malformed_cursor_is_rejected(client, logbook, cursor):
+    response = client.get(f"/api/alice/stream?limit=2&cursor={cursor}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_limit_is_clamped(client, logbook, monkeypatch):
+    assert len(client.get("/api/alice/stream?limit=0").get_json()["items"]) == 1
+    assert len(client.get("/api/alice/stream?limit=-5").get_json()["items"]) == 1
+    monkeypatch.setattr("routes.ascents.MAX_PAGE_SIZE", 3)
+    page = client.get("/api/alice/stream?limit=1000").get_json()
+    assert len(page["items"]) == 3
+    assert page["next"] is not None
+
+
+@pytest.mark.parametrize("query", ["", "?year=2024", "?ytd=1"])
+def test_streamed_response_matches_the_full_list(client, logbook, query):
+    full = client.get(f"/api/alice/stream{query}")
+    streamed = client.get(f"/api/alice/stream{query}{'&' if query else '?'}stream=1")
+    assert streamed.is_streamed
+    assert streamed.get_json() == full.get_json()
+    sends = client.get(f"/api/alice/ascents{query}{'&' if query else '?'}stream=1")
+    assert sends.get_json() == client.get(f"/api/alice/ascents{query}").get_json()
+
+
+@pytest.fixture
+def sends(db, user):
+    """Sends this year (up to today), plus ones the pyramid must leave out."""
+    jan1, today = date(date.today().year, 1, 1), date.today()
+    grades = [("V4", 1), ("5.11a", 0), ("5.11b", 0), ("5.11c", 0), ("5.11c", 2), ("5.11d", 0), ("5.10", 0), ("5.12a", 2)]
+    for grade, climb_type in grades:
+        project = Project(user_id=user.id, name=f"{grade} {climb_type}", grade=grade, type=climb_type)
+        project.sessions = [
+            Session(date=jan1, style=2),
+            Session(date=today, style=1),
+            Session(date=today, style=0),                             # attempt
+            Session(date=date(today.year - 1, 6, 1), style=2),        # last year
+            Session(date=today, style=2, planned=True),
+        ]
+        db.session.add(project)
+    db.session.commit()
+    SessionRollup.rebuild(user.id)
+    db.session.commit()
+    return user
+
+
+def test_pyramid_rollups_and_ytd_sessions_agree(client, sends):
+    this_year = client.get(f"/api/alice/ascents/pyramid?year={date.today().year}").get_json()
+    ytd = client.get("/api/alice/ascents/pyramid?ytd=1").get_json()
+
+    assert this_year == ytd
+    assert {(p["grade"], p["style"]): p["count"] for p in ytd if p["type"] == 1} == {("V4", 1): 1, ("V4", 2): 1}
+    for buckets in ("", "&buckets=mp"):
+        assert (
+            client.get(f"/api/alice/ascents/pyramid?year={date.today().year}{buckets}").get_json()
+            == client.get(f"/api/alice/ascents/pyramid?ytd=1{buckets}").get_json()
+        )
+
+
+def test_pyramid_without_a_year_counts_every_year(client, sends):
+    pyramid = client.get("/api/alice/ascents/pyramid").get_json()
+    assert {p["count"] for p in pyramid if p["style"] == 2} == {2}
+    assert {p["count"] for p in pyramid if p["style"] == 1} == {1}
+
+
+def test_pyramid_mountain_project_buckets(client, sends):
+    pyramid = client.get("/api/alice/ascents/pyramid?ytd=1&buckets=mp").get_json()
+    sends_by_bucket = {(p["grade"], p["type"]): p["count"] for p in pyramid if p["style"] == 2}
+    assert sends_by_bucket == {
+        ("V4", 1): 1,          # boulder grades are left alone
+        ("5.11-", 0): 1,
+        ("5.11", 0): 2,        # 5.11b and 5.11c fold together
+        ("5.11", 2): 1,        # trad 5.11c: buckets are per type
+        ("5.11+", 0): 1,
+        ("5.10", 0): 1,        # no letter grade to bucket
+        ("5.12-", 2): 1,
+    }
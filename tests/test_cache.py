@@ -0,0 +1,85 @@
+from sqlalchemy import inspect
+
+import cache
+from models import Project, User
+
+
+def _warm(client, username="alice"):
+    assert client.get(f"/api/{username}/projects").status_code == 200
+
+
+def test_rename_drops_the_old_username(db, client, user):
+    _warm(client)
+    user.username = "alicia"
+    db.session.commit()
+
+    assert cache._users.get(user.id) is None
+    assert cache._user_ids.get("alice") is None
+    assert client.get("/api/alice/projects").status_code == 404
+    _warm(client, "alicia")
+
+
+def test_renamed_user_is_not_found_by_a_stale_username(db, client, user):
+    # Entries another process cached are only dropped by their TTL
+    _warm(client)
+    db.session.execute(db.update(User).where(User.id == user.id).values(username="alicia"))
+    db.session.commit()
+    cache._users.pop(user.id)
+
+    assert client.get("/api/alice/projects").status_code == 404
+
+
+def test_delete_drops_the_user(db, client, user):
+    _warm(client)
+    user_id = user.id
+    db.session.delete(user)
+    db.session.commit()
+
+    assert cache.get_user(user_id) is None
+    assert client.get("/api/alice/projects").status_code == 404
+
+
+def test_data_version_bumps_are_never_served_stale(db, client, login, user):
+    login(user)
+    _warm(client)
+    assert client.post("/api/alice/projects", json={"name": "Moonlight", "grade": "V4"}).status_code == 201
+    assert cache._users.get(user.id) is None  # bumped through the ORM: dropped on commit
+
+    user_id = user.id
+    _warm(client)
+    User.bump_data_version_where(User.id == user_id)  # bulk: not seen by the flush hook
+    db.session.commit()
+    db.session.remove()
+    assert cache.get_user(user_id).data_version == 2
+
+
+def test_rolled_back_changes_keep_the_entry(db, client, user):
+    _warm(client)
+    user.username = "alicia"
+    db.session.flush()
+    db.session.rollback()
+
+    assert cache._users.get(user.id) is not None
+    _warm(client)
+
+
+def test_merged_users_are_usable_across_requests(app, db, client, login, user):
+    user_id = user.id
+    login(user)
+    db.session.add(Project(user_id=user_id, name="Moonlight", grade="V4"))
+    db.session.commit()
+    for height in (170, 171):
+        # A context per request, as in production: new db session and g each time
+        with app.app_context():
+            response = client.put("/api/auth/profile", json={"height_cm": height})
+            assert response.get_json()["height_cm"] == height
+        assert cache._users.get(user_id) is None  # the edit dropped it
+        with app.app_context():
+            assert client.get("/api/auth/me").get_json()["height_cm"] == height
+
+    with app.app_context():
+        snapshot = cache._users.get(user_id)
+        assert inspect(snapshot).detached  # never bound to a request's session
+        merged = cache.get_user(user_id)
+        assert merged is not snapshot and inspect(merged).session is db.session()
+        assert (merged.height_cm, [p.name for p in merged.projects]) == (171, ["Moonlight"])
@@ -0,0 +1,92 @@
+from datetime import date
+
+from models import Project, Session, User
+
+
+def _make_user(db, username):
+    user = User(username=username)
+    user.set_password("secret1")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _make_project(db, user, name="Moonlight", sessions=1):
+    project = Project(user_id=user.id, name=name, grade="V4", type=1)
+    project.sessions = [Session(date=date(2024, 5, d + 1)) for d in range(sessions)]
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_sessions_of_another_users_project_are_not_found(db, client, user):
+    # Under another username the list would validate against that user's
+    # data_version, which the project owner's writes never bump
+    project = _make_project(db, user, sessions=2)
+    _make_user(db, "bob")
+
+    assert client.get(f"/api/bob/projects/{project.id}/sessions").status_code == 404
+    response = client.get(f"/api/alice/projects/{project.id}/sessions")
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+
+
+def test_matching_if_none_match_gets_304(db, client, user):
+    first = client.get("/api/alice/projects")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    response = client.get("/api/alice/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.get_data() == b""
+    # Every read API of the user shares it
+    assert client.get("/api/alice/stream", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_write_changes_the_etag(db, client, login, user):
+    etag = client.get("/api/alice/projects").headers["ETag"]
+
+    login(user).post("/api/alice/projects", json={"name": "Moonlight", "grade": "V4", "type": 1})
+
+    response = client.get("/api/alice/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [p["name"] for p in response.get_json()] == ["Moonlight"]
+
+
+def test_another_users_write_keeps_the_etag(db, client, login, user):
+    etag = client.get("/api/alice/projects").headers["ETag"]
+    bob = _make_user(db, "bob")
+
+    login(bob).post("/api/bob/projects", json={"name": "Moonlight", "grade": "V4", "type": 1})
+
+    assert client.get("/api/alice/projects", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_viewer_dependent_endpoints_are_not_validated(db, client, login, user):
+    etag = client.get("/api/alice/projects").headers["ETag"]
+
+    # bootstrap carries "me", which the data version doesn't cover
+    response = client.get("/api/alice/bootstrap", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.get_json()["me"] is None
+    assert login(user).get("/api/alice/bootstrap").get_json()["me"]["username"] == "alice"
+
+
+def test_owner_only_endpoints_are_not_validated(db, client, login, user):
+    etag = client.get("/api/alice/projects").headers["ETag"]
+
+    assert client.get("/api/alice/export", headers={"If-None-Match": etag}).status_code == 401
+    response = login(user).get("/api/alice/export", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_unknown_user_gets_no_etag(db, client):
+    response = client.get("/api/nobody/projects")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import jobs
+from models import Job
+from models.job import JOB_FAILED, JOB_PENDING, JOB_RUNNING
+
+
+@pytest.fixture
+def wakeups(app, monkeypatch):
+    """Leave jobs queued for the test to run with run_next.
+
+    JOBS_EAGER is off, and the runner wakeups a commit would send to the
+    thread pool are recorded instead.
+    """
+    monkeypatch.setitem(app.config, "JOBS_EAGER", False)
+    submitted = []
+
+    class Pool:
+        def submit(self, fn, *args):
+            submitted.append(fn)
+
+    monkeypatch.setattr(jobs, "start", lambda app: Pool())
+    return submitted
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Register an "echo" handler recording its payloads; "fail" raises."""
+    received = []
+    monkeypatch.setitem(jobs.HANDLERS, "echo", lambda **payload: received.append(payload))
+
+    def fail(**payload):
+        received.append(payload)
+        raise ValueError("boom")
+
+    monkeypatch.setitem(jobs.HANDLERS, "fail", fail)
+    return received
+
+
+def _add_job(db, key, status=JOB_PENDING, run_after=None, kind="echo", **payload):
+    job = Job(kind=kind, key=key, payload=payload, status=status, run_after=run_after or datetime.utcnow())
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_enqueue_reschedules_the_pending_job_for_a_key(db, wakeups, calls):
+    jobs.enqueue("echo", "k", n=1)
+    db.session.commit()
+    db.session.execute(db.update(Job).values(run_after=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+
+    jobs.enqueue("echo", "k", n=2)
+    db.session.commit()
+
+    job = db.session.scalars(db.select(Job)).one()
+    assert job.payload == {"n": 2}
+    assert job.run_after <= datetime.utcnow()
+    assert jobs.run_next() is True
+    assert calls == [{"n": 2}]
+    assert db.session.scalars(db.select(Job)).all() == []
+    assert jobs.run_next() is None
+
+
+def test_enqueue_unknown_kind_raises(db, wakeups):
+    with pytest.raises(ValueError):
+        jobs.enqueue("nope", "k")
+
+
+def test_commit_wakes_the_runner_and_rollback_drops_the_job(db, wakeups, calls):
+    jobs.enqueue("echo", "a")
+    db.session.rollback()
+    db.session.commit()
+    assert wakeups == []
+    assert db.session.scalars(db.select(Job)).all() == []
+
+    jobs.enqueue("echo", "b")
+    db.session.commit()
+    assert wakeups == [jobs.run_due]
+
+
+def test_run_next_returns_false_when_another_runner_claims_first(db, wakeups, calls):
+    job_id = _add_job(db, "k")
+    claimed = []
+
+    def claim_elsewhere(conn, cursor, statement, *args):
+        # Another runner's claim commits between this one's read and UPDATE
+        if statement.startswith("UPDATE jobs SET status") and not claimed:
+            claimed.append(job_id)
+            with db.engine.begin() as other:
+                other.execute(db.update(Job).where(Job.id == job_id).values(
+                    status=JOB_RUNNING, run_after=datetime.utcnow() + jobs.LEASE
+                ))
+
+    event.listen(db.engine, "before_cursor_execute", claim_elsewhere)
+    try:
+        assert jobs.run_next() is False
+    finally:
+        event.remove(db.engine, "before_cursor_execute", claim_elsewhere)
+    assert calls == []
+
+
+def test_failing_job_backs_off_then_fails(db, wakeups, calls):
+    job_id = _add_job(db, "k", kind="fail")
+
+    assert jobs.run_next() is True
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts, job.last_error) == (JOB_PENDING, 1, "ValueError: boom")
+    assert job.run_after >= datetime.utcnow() + timedelta(seconds=jobs.BACKOFF_SECONDS - 1)
+    assert jobs.run_next() is None  # still in backoff
+
+    for _ in range(jobs.MAX_ATTEMPTS - 1):
+        assert jobs.run_next(include_scheduled=True) is True
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == (JOB_FAILED, jobs.MAX_ATTEMPTS)
+    assert len(calls) == jobs.MAX_ATTEMPTS
+    assert jobs.run_next(include_scheduled=True) is None
+
+
+def test_failed_run_is_dropped_when_its_key_was_enqueued_again(db, wakeups, monkeypatch):
+    def fail_after_requeue(**payload):
+        with db.engine.begin() as other:
+            other.execute(db.insert(Job).values(
+                kind="echo", key="k", payload={}, status=JOB_PENDING, attempts=0, run_after=datetime.utcnow()
+            ))
+        raise ValueError("boom")
+
+    monkeypatch.setitem(jobs.HANDLERS, "requeued", fail_after_requeue)
+    first = _add_job(db, "k", kind="requeued")
+
+    assert jobs.run_next() is True
+    remaining = db.session.scalars(db.select(Job)).all()
+    assert [(j.kind, j.status) for j in remaining] == [("echo", JOB_PENDING)]
+    assert remaining[0].id != first
+
+
+def test_requeue_failed(db, wakeups, calls):
+    lone = _add_job(db, "a", status=JOB_FAILED)
+    db.session.get(Job, lone).attempts = jobs.MAX_ATTEMPTS
+    duplicate = _add_job(db, "b", status=JOB_FAILED)
+    queued = _add_job(db, "b")
+
+    assert jobs.requeue_failed() == 2
+
+    job = db.session.get(Job, lone)
+    assert (job.status, job.attempts) == (JOB_PENDING, 0)
+    assert db.session.get(Job, duplicate) is None  # "b" is already queued
+    assert db.session.get(Job, queued).status == JOB_PENDING
+
+
+def test_abandoned_job_is_run_again_once_its_lease_expires(db, wakeups, calls):
+    _add_job(db, "live", status=JOB_RUNNING, run_after=datetime.utcnow() + jobs.LEASE, n=1)
+    _add_job(db, "dead", status=JOB_RUNNING, run_after=datetime.utcnow() - timedelta(seconds=1), n=2)
+
+    assert jobs.run_next() is True
+    assert calls == [{"n": 2}]
+    assert jobs.run_next() is None  # the live lease is left alone
+
+
+def test_key_is_not_claimed_while_it_is_running(db, wakeups, calls):
+    # Two runs of one key would race on the same rollup rows
+    running = _add_job(db, "k", status=JOB_RUNNING, run_after=datetime.utcnow() + jobs.LEASE, n=1)
+    _add_job(db, "k", n=2)
+
+    assert jobs.run_next() is None
+
+    db.session.execute(db.delete(Job).where(Job.id == running))
+    db.session.commit()
+    assert jobs.run_next() is True
+    assert calls == [{"n": 2}]
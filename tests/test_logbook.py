@@ -0,0 +1,268 @@
+import io
+import json
+from datetime import date
+
+from models import Country, Location, Project, Session, SessionRollup, User
+
+KEXIAN_CSV = """\
+date,style,planned,notes,name,grade,type,pitches,length,project_notes,country_code,state_code,area,crag
+2024-03-01,attempt,,cold,Moonlight,V4,boulder,,,highball,US,US-CA,Bishop,Buttermilks
+2024-03-02,send,,,Moonlight,V4,boulder,,,highball,US,US-CA,Bishop,Buttermilks
+2023-11-05,flash,,,Pinched,5.12a,sport,1,25m,,US,US-NV,Red Rock,
+,,,,Someday,V9,boulder,,,,,,,
+"""
+
+MP_CSV = """\
+Date,Route,Rating,Notes,URL,Pitches,Location,Avg Stars,Your Stars,Style,Lead Style,Route Type,Your Rating,Length,Rating Code
+2024-05-10,Iron Man,V4,,https://example.com/1,1,California > Bishop Area > Buttermilks,3.5,-1,Send,,Boulder,,,
+2024-05-11,Cloud Tower,5.12a PG13,long day,https://example.com/2,12,Nevada > Red Rock > Juniper Canyon,3.9,-1,Lead,Redpoint,Trad,,1200,
+2024-05-12,La Rambla,5.13d,,https://example.com/3,1,International > Europe > Spain > Siurana > El Pati,4,-1,Lead,Fell/Hung,Sport,,40,
+"""
+
+# Importing into a new country and state looks the country up more than
+# once (Country.ids_for, then again from Subdivision.ids_for), a fixed few
+# repeats however many rows; the tests doing that take allow_sql_repeats
+
+
+def _import(client, user, **kwargs):
+    response = client.post(f"/api/{user.username}/import", **kwargs)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def _upload(text):
+    return {"data": {"file": (io.BytesIO(text.encode()), "logbook.csv")}, "content_type": "multipart/form-data"}
+
+
+def _sessions(db, user):
+    rows = db.session.execute(
+        db.select(Project.name, Session.date, Session.style, Session.planned)
+        .join(Project, Session.project_id == Project.id)
+        .where(Project.user_id == user.id)
+        .order_by(Project.name, Session.date)
+    )
+    return [tuple(row) for row in rows]
+
+
+def test_import_requires_the_owner(db, client, user):
+    assert client.post("/api/alice/import", json=[]).status_code == 401
+
+
+def test_import_kexian_csv(db, client, login, user, allow_sql_repeats):
+    result = _import(login(user), user, **_upload(KEXIAN_CSV))
+
+    assert result["imported_rows"] == 4
+    assert (result["locations_created"], result["projects_created"], result["sessions_created"]) == (2, 3, 3)
+    assert result["errors"] == []
+    assert _sessions(db, user) == [
+        ("Moonlight", date(2024, 3, 1), 0, False),
+        ("Moonlight", date(2024, 3, 2), 2, False),
+        ("Pinched", date(2023, 11, 5), 1, False),
+    ]
+    pinched = Project.query.filter_by(name="Pinched").one()
+    assert (pinched.type, pinched.pitches, pinched.length) == (0, 1, "25m")
+    assert (pinched.location.state_code, pinched.location.area) == ("US-NV", "Red Rock")
+    assert Project.query.filter_by(name="Someday").one().location is None
+
+
+def test_import_csv_body(db, client, login, user, allow_sql_repeats):
+    result = _import(login(user), user, data=KEXIAN_CSV, content_type="text/csv")
+    assert result["sessions_created"] == 3
+
+
+def test_import_mountain_project_ticks(db, client, login, user):
+    result = _import(login(user), user, **_upload(MP_CSV))
+
+    assert result["errors"] == []
+    iron_man = Project.query.filter_by(name="Iron Man").one()
+    assert (iron_man.type, iron_man.grade) == (1, "V4")
+    assert (iron_man.location.state_code, iron_man.location.area, iron_man.location.crag) == (
+        "US-CA", "Bishop Area", "Buttermilks",
+    )
+    cloud_tower = Project.query.filter_by(name="Cloud Tower").one()
+    assert (cloud_tower.type, cloud_tower.grade, cloud_tower.pitches) == (2, "5.12a", 12)
+    rambla = Project.query.filter_by(name="La Rambla").one()
+    assert (rambla.type, rambla.location.country_code, rambla.location.area) == (0, "ES", "Siurana")
+    assert [(name, style) for name, _, style, _ in _sessions(db, user)] == [
+        ("Cloud Tower", 2), ("Iron Man", 2), ("La Rambla", 0),
+    ]
+
+
+def test_import_json_projects(db, client, login, user, allow_sql_repeats):
+    logbook = {"projects": [
+        {
+            "name": "Moonlight", "grade": "V4", "type": "boulder", "notes": "highball",
+            "location": {"country_code": "US", "state_code": "US-CA", "area": "Bishop", "crag": "Buttermilks"},
+            "sessions": [
+                {"date": "2024-03-01", "style": "attempt"},
+                {"date": "2024-03-02", "style": 2},
+                {"date": "2099-01-01", "planned": True},
+            ],
+        },
+        {"name": "Someday", "grade": "V9", "type": 1},
+    ]}
+    result = _import(login(user), user, json=logbook)
+
+    assert (result["projects_created"], result["sessions_created"]) == (2, 3)
+    assert _sessions(db, user) == [
+        ("Moonlight", date(2024, 3, 1), 0, False),
+        ("Moonlight", date(2024, 3, 2), 2, False),
+        ("Moonlight", date(2099, 1, 1), 0, True),
+    ]
+
+
+def test_import_reports_bad_rows_and_keeps_the_rest(db, client, login, user):
+    rows = [
+        {"name": "Good", "grade": "V3", "date": "2024-01-01"},
+        {"name": "", "grade": "V3"},
+        {"name": "Bad grade", "grade": "V99"},
+        {"name": "Bad type", "grade": "V3", "type": 7},
+        {"name": "Bad style", "grade": "V3", "date": "2024-01-01", "style": "hangdog"},
+        {"name": "Bad date", "grade": "V3", "date": "01/02/2024"},
+        {"name": "Bad planned", "grade": "V3", "date": "2024-01-01", "planned": "maybe"},
+        {"name": "Bad country", "grade": "V3", "area": "Nowhere", "country_code": "XX"},
+        "not an object",
+    ]
+    result = _import(login(user), user, json=rows)
+
+    assert (result["rows"], result["imported_rows"], result["error_count"]) == (9, 1, 8)
+    assert [e["row"] for e in result["errors"]] == [2, 3, 4, 5, 6, 7, 8, 9]
+    assert result["errors"][0]["error"] == "Name is required."
+    assert "hangdog" in result["errors"][3]["error"]
+    assert [name for name, *_ in _sessions(db, user)] == ["Good"]
+
+
+def test_import_rejects_unreadable_bodies(db, client, login, user):
+    response = login(user).post("/api/alice/import", json={"nothing": "here"})
+    assert response.status_code == 400
+
+
+def test_import_reuses_existing_locations_and_projects(db, client, login, user):
+    country_id = Country.ids_for(["US"])["US"]
+    bishop = Location(country_id=country_id, area="Bishop", crag="")
+    db.session.add(bishop)
+    db.session.flush()
+    project = Project(user_id=user.id, name="Moonlight", grade="V4", type=1, location_id=bishop.id)
+    project.sessions = [Session(date=date(2024, 3, 1), style=0)]
+    db.session.add(project)
+    db.session.commit()
+    row = {"name": "Moonlight", "grade": "V4", "type": 1, "country_code": "US", "area": "Bishop"}
+
+    result = _import(login(user), user, json=[
+        {**row, "date": "2024-03-01", "style": 0},   # already logged
+        {**row, "date": "2024-03-02", "style": 2},
+        {**row, "date": "2024-03-02", "style": 2},   # repeated within the file
+    ])
+
+    assert (result["locations_created"], result["projects_created"]) == (0, 0)
+    assert (result["sessions_created"], result["sessions_skipped"]) == (1, 2)
+    assert Location.query.count() == 1
+    assert Project.query.count() == 1
+
+    again = _import(client, user, json=[{**row, "date": "2024-03-02", "style": 2}])
+    assert (again["sessions_created"], again["sessions_skipped"]) == (0, 1)
+
+
+def test_import_refreshes_summaries_and_rollups(db, client, login, user, allow_sql_repeats):
+    _import(login(user), user, **_upload(KEXIAN_CSV))
+
+    moonlight = Project.query.filter_by(name="Moonlight").one()
+    assert (moonlight.attempt_count, moonlight.send_count) == (1, 1)
+    assert (moonlight.last_session_date, moonlight.first_send_date) == (date(2024, 3, 2), date(2024, 3, 2))
+    assert moonlight.status == 3  # Sent
+    assert Project.query.filter_by(name="Someday").one().status == 0  # To Try
+
+    rollups = {
+        (r.year, r.type, r.grade, r.style): r.count
+        for r in SessionRollup.query.filter_by(user_id=user.id)
+    }
+    assert rollups == {
+        (2024, 1, "V4", 0): 1,
+        (2024, 1, "V4", 2): 1,
+        (2023, 0, "5.12a", 1): 1,
+    }
+
+
+def test_import_row_limit(db, client, login, user, monkeypatch):
+    monkeypatch.setattr("routes.logbook.MAX_IMPORT_ROWS", 2)
+    rows = [{"name": "x", "grade": "V1"}] * 3
+    assert login(user).post("/api/alice/import", json=rows).status_code == 413
+
+
+def _snapshot(db, user):
+    """Everything an export carries, minus ids: projects with their location, and sessions."""
+    projects = [
+        (p.name, p.grade, p.type, p.pitches, p.length, p.notes, p.location.display_name() if p.location else None)
+        for p in Project.query.filter_by(user_id=user.id).order_by(Project.name)
+    ]
+    sessions = db.session.execute(
+        db.select(Project.name, Session.date, Session.style, Session.planned, Session.notes)
+        .join(Project, Session.project_id == Project.id)
+        .where(Project.user_id == user.id)
+        .order_by(Project.name, Session.date)
+    ).all()
+    return projects, [tuple(row) for row in sessions]
+
+
+def _second_user(db, client):
+    client.post("/api/auth/logout")
+    bob = User(username="bob")
+    bob.set_password("secret1")
+    db.session.add(bob)
+    db.session.commit()
+    return bob
+
+
+def test_export_is_owner_only(db, client, login, user):
+    assert client.get("/api/alice/export").status_code == 401
+    bob = _second_user(db, client)
+    login(bob)
+    assert client.get("/api/alice/export").status_code == 403
+    assert client.get("/api/nobody/export").status_code == 404
+
+
+def test_export_ignores_if_none_match_from_others(db, client, login, user):
+    # The data ETag is public; a 304 for it would skip the owner check
+    etag = client.get("/api/alice/projects").headers["ETag"]
+    response = client.get("/api/alice/export", headers={"If-None-Match": etag})
+    assert response.status_code == 401
+
+
+def test_export_csv_round_trips_through_import(db, client, login, user, allow_sql_repeats):
+    _import(login(user), user, **_upload(KEXIAN_CSV))
+    response = client.get("/api/alice/export?format=csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "attachment" in response.headers["Content-Disposition"]
+    exported = response.get_data(as_text=True)
+
+    bob = _second_user(db, client)
+    result = _import(login(bob), bob, **_upload(exported))
+
+    assert result["errors"] == []
+    assert _snapshot(db, bob) == _snapshot(db, user)
+
+
+def test_export_jsonl_round_trips_through_import(db, client, login, user, allow_sql_repeats):
+    _import(login(user), user, **_upload(KEXIAN_CSV))
+    response = client.get("/api/alice/export")
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r["kind"] for r in records] == ["location"] * 2 + ["project"] * 3 + ["session"] * 3
+
+    locations = {r["id"]: r for r in records if r["kind"] == "location"}
+    projects = {r["id"]: {**r, "location": locations.get(r["location_id"]), "sessions": []}
+                for r in records if r["kind"] == "project"}
+    for r in records:
+        if r["kind"] == "session":
+            projects[r["project_id"]]["sessions"].append(r)
+
+    bob = _second_user(db, client)
+    result = _import(login(bob), bob, json={"projects": list(projects.values())})
+
+    assert result["errors"] == []
+    assert _snapshot(db, bob) == _snapshot(db, user)
+
+
+def test_export_rejects_unknown_format(db, client, login, user):
+    assert login(user).get("/api/alice/export?format=xml").status_code == 400
@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+import pytest
+
+from models import Country, Location, Project, Session
+
+
+def _seed_projects(db, user, count):
+    country_id = Country.ids_for(["US"])["US"]
+    location = Location(country_id=country_id, area="Bishop")
+    db.session.add(location)
+    for i in range(count):
+        project = Project(user_id=user.id, name=f"Problem {i}", grade="V5", type=1, location=location)
+        project.sessions = [
+            Session(date=date(2024, 1, 1) + timedelta(days=d), style=d % 3) for d in range(3)
+        ]
+        db.session.add(project)
+    db.session.commit()
+
+
+@pytest.mark.parametrize("query_string", ["", "?status=0,1,3", "?date=2024"])
+def test_project_list_query_count_does_not_grow_with_projects(db, client, user, count_queries, query_string):
+    url = f"/api/{user.username}/projects{query_string}"
+    counts = []
+    for added in (5, 45):  # 5 projects, then 50
+        _seed_projects(db, user, added)
+        client.get(url)  # warm the user cache, so both runs do the same lookups
+        with count_queries() as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
@@ -0,0 +1,158 @@
+from datetime import date
+
+import pytest
+
+import search
+from models import Country, Location, Project, Session, Subdivision, User
+
+
+@pytest.fixture
+def climbs(db, user):
+    """Alice's logbook, plus Bob's with the same words in it."""
+    us = Country.ids_for(["US"])["US"]
+    bishop = Location(country_id=us, area="Bishop", crag="Buttermilk Country")
+    red_rock = Location(country_id=us, area="Red Rock", crag="")
+    db.session.add_all([bishop, red_rock])
+    db.session.flush()
+    bob = User(username="bob")
+    bob.set_password("secret1")
+    db.session.add(bob)
+    db.session.flush()
+    named = Project(user_id=user.id, name="Buttermilk Stem", grade="V8", type=1, location_id=bishop.id)
+    noted = Project(user_id=user.id, name="Iron Man", grade="V4", type=1, notes="left of the buttermilk boulder")
+    noted.sessions = [Session(date=date(2024, 3, 1), notes="buttermilk was too warm")]
+    db.session.add_all([
+        named, noted,
+        Project(user_id=bob.id, name="Buttermilk Stem", grade="V8", type=1, location_id=red_rock.id),
+    ])
+    # Words found in nearly every row carry no weight in bm25, so give the
+    # matches some company
+    for n in range(20):
+        filler = Project(user_id=user.id, name=f"Problem {n}", grade="V3", type=1, notes="short and steep")
+        filler.sessions = [Session(date=date(2024, 1, 1), notes="quick session")]
+        db.session.add(filler)
+        db.session.add(Location(country_id=us, area=f"Area {n}", crag="Main wall"))
+    db.session.commit()
+    return {"named": named.id, "noted": noted.id, "session": noted.sessions[0].id, "bishop": bishop.id}
+
+
+def _hits(user, query, limit=20):
+    return [(hit.kind, hit.id) for hit in search.find(user.id, query, limit)]
+
+
+def test_name_matches_outrank_notes(db, user, climbs):
+    hits = _hits(user, "buttermilk")
+    assert sorted(hits) == sorted([
+        ("location", climbs["bishop"]),
+        ("project", climbs["named"]),
+        ("project", climbs["noted"]),
+        ("session", climbs["session"]),
+    ])
+    assert [hit for hit in hits if hit[0] == "project"] == [("project", climbs["named"]), ("project", climbs["noted"])]
+    ranks = [hit.rank for hit in search.find(user.id, "buttermilk", 20)]
+    assert ranks == sorted(ranks, reverse=True)
+
+
+def test_every_term_matches_as_a_prefix(db, user, climbs):
+    assert _hits(user, "butter coun") == [("location", climbs["bishop"])]
+    assert _hits(user, "BUTTER, stem!") == [("project", climbs["named"])]
+    assert _hits(user, "butter rock") == []
+    assert _hits(user, "milk") == []  # prefixes of words, not substrings
+    assert _hits(user, "?!") == []
+
+
+def test_results_are_scoped_to_the_user(db, user, climbs):
+    bob = User.query.filter_by(username="bob").one()
+    bobs = Project.query.filter_by(user_id=bob.id).one()
+    assert _hits(bob, "buttermilk") == [("project", bobs.id)]
+    # Red Rock is Bob's location only
+    assert _hits(bob, "red") == [("location", bobs.location_id)]
+    assert _hits(user, "red") == []
+
+
+def test_index_follows_updates_and_deletes(db, user, climbs):
+    project = db.session.get(Project, climbs["named"])
+    project.name = "Soft Serve"
+    db.session.get(Location, climbs["bishop"]).crag = "Happy Boulders"
+    db.session.delete(db.session.get(Session, climbs["session"]))
+    db.session.commit()
+
+    assert _hits(user, "buttermilk") == [("project", climbs["noted"])]
+    assert _hits(user, "soft") == [("project", climbs["named"])]
+    assert _hits(user, "happy") == [("location", climbs["bishop"])]
+
+    db.session.delete(db.session.get(Project, climbs["noted"]))
+    project.grade = "V9"  # not indexed: the update trigger skips it
+    db.session.commit()
+    assert _hits(user, "buttermilk") == []
+    assert _hits(user, "soft") == [("project", climbs["named"])]
+
+
+def test_search_api_pages_by_offset(db, client, user, climbs):
+    assert client.get("/api/alice/search?q=").status_code == 400
+    assert client.get("/api/nobody/search?q=x").status_code == 404
+
+    full = client.get("/api/alice/search?q=buttermilk").get_json()
+    assert len(full["items"]) == 4 and full["next"] is None
+    first = client.get("/api/alice/search?q=buttermilk&limit=3").get_json()
+    assert first["next"] == 3
+    last = client.get("/api/alice/search?q=buttermilk&limit=3&offset=3").get_json()
+    assert last["next"] is None
+    assert first["items"] + last["items"] == full["items"]
+
+    by_kind = {item["kind"]: item for item in full["items"]}
+    assert by_kind["location"]["location"]["display_name"] == "Buttermilk Country, Bishop, United States"
+    assert by_kind["session"]["session"]["notes"] == "buttermilk was too warm"
+    assert by_kind["session"]["project"]["name"] == "Iron Man"
+
+
+@pytest.fixture
+def crags(db):
+    us = Country.ids_for(["US"])["US"]
+    states = Subdivision.ids_for(["US-CA", "US-NV"])
+    db.session.add_all([
+        Location(country_id=us, subdivision_id=states["US-CA"], area="Bishop", crag="Buttermilks"),
+        Location(country_id=us, subdivision_id=states["US-CA"], area="Bishop", crag="Happy Boulders"),
+        Location(country_id=us, subdivision_id=states["US-NV"], area="Red Rock", crag="Kraft Boulders"),
+        Location(country_id=us, area="Old Bishop Road", crag=""),
+        Location(country_id=us, area="Sunset Bishop", crag="50% Wall"),
+    ])
+    db.session.commit()
+
+
+def _typeahead(client, query):
+    response = client.get(f"/api/locations/search?{query}")
+    assert response.status_code == 200
+    return [location["display_name"] for location in response.get_json()]
+
+
+def test_typeahead_orders_prefixes_first(db, client, crags):
+    assert _typeahead(client, "q=bish") == [
+        "Buttermilks, Bishop, California, United States",
+        "Happy Boulders, Bishop, California, United States",
+        "50% Wall, Sunset Bishop, United States",   # a word starts with it; shorter area first
+        "Old Bishop Road, United States",
+    ]
+    assert _typeahead(client, "q=boulders") == [
+        "Happy Boulders, Bishop, California, United States",
+        "Kraft Boulders, Red Rock, Nevada, United States",
+    ]
+
+
+def test_typeahead_matches_every_word_and_states(db, client, crags):
+    assert _typeahead(client, "q=bishop+happy") == ["Happy Boulders, Bishop, California, United States"]
+    assert _typeahead(client, "q=nevada") == ["Kraft Boulders, Red Rock, Nevada, United States"]
+    assert _typeahead(client, "q=boulders+nv") == ["Kraft Boulders, Red Rock, Nevada, United States"]
+    assert _typeahead(client, "q=%25%25%25") == []  # LIKE wildcards are matched literally
+    assert _typeahead(client, "q=50%25") == ["50% Wall, Sunset Bishop, United States"]
+    assert _typeahead(client, "q=ab") == []
+    assert _typeahead(client, "q=") == []
+
+
+def test_typeahead_limit(db, client, crags, monkeypatch):
+    assert len(_typeahead(client, "q=bishop&limit=2")) == 2
+    assert len(_typeahead(client, "q=bishop&limit=0")) == 1
+    monkeypatch.setattr("routes.locations.DEFAULT_SEARCH_LIMIT", 3)
+    assert len(_typeahead(client, "q=bishop")) == 3
+    monkeypatch.setattr("routes.locations.MAX_SEARCH_LIMIT", 2)
+    assert len(_typeahead(client, "q=bishop&limit=50")) == 2
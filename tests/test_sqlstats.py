@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import exc, text
+
+from sqlstats import RepeatedQueryError
+
+
+def test_failed_statement_leaves_no_start_time(app, db):
+    with db.engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info.get("query_start", []) == []
+
+
+def test_repeated_query_error_leaves_no_start_time(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_REPEAT_LIMIT", 1)
+    with app.test_request_context("/"), db.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(RepeatedQueryError):
+            conn.execute(text("SELECT 1"))
+        assert conn.info.get("query_start", []) == []